@@ -1,2 +1,14 @@
 """API routers package."""
+from typing import Any, Dict, Type
+from pydantic import BaseModel
 
+
+def model_response(model: Type[BaseModel]) -> Dict[int | str, Dict[str, Any]]:
+    """
+    OpenAPI 200 response for endpoints declared with ``response_model=None``.
+    
+    Write endpoints return the model instance FastAPI already validated from the
+    request body; skipping ``response_model`` avoids dumping and re-validating it
+    on the way out while keeping the documented response schema.
+    """
+    return {200: {"model": model}}
@@ -1,12 +1,14 @@
 """Operations API — alerts, stations, incidents, dashboard summary, simulation, demo reset."""
 import logging
+from collections import defaultdict
 from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException
 from app.models import (
     ReadinessAlert, AlertState, AcknowledgeAlertRequest,
     Station, OperationalIncident, DashboardSummary,
     SimulationRequest, SimulationResult,
-    Personnel, UnitAssignment, AssignmentStatus,
+    Personnel, UnitAssignment,
+    parse_expiration,
 )
 from app.stores import (
     alerts_store, stations_store, incidents_store,
@@ -23,6 +25,16 @@ router = APIRouter()
 
 # ── Dashboard summary ─────────────────────────────────────────────────────────
 
+def _group_by_station(unit_readiness: list) -> dict:
+    """Group unit readiness rows by their unit's station in a single pass."""
+    grouped = defaultdict(list)
+    for r in unit_readiness:
+        unit = units_store.get(r["unit_id"])
+        if unit:
+            grouped[unit.station_id].append(r)
+    return grouped
+
+
 @router.get("/api/dashboard/summary", response_model=DashboardSummary)
 async def get_dashboard_summary():
     unit_readiness = ReadinessService.check_all_units()
@@ -32,12 +44,13 @@ async def get_dashboard_summary():
     critical = sum(1 for u in unit_readiness if u["readiness_score"] < 60)
     overall = (sum(u["readiness_score"] for u in unit_readiness) / total) if total else 0.0
 
-    open_alerts = sum(1 for a in alerts_store.values() if a.state == AlertState.OPEN)
-    active_inc = sum(1 for i in incidents_store.values() if i.is_active)
+    open_alerts = alerts_store.count_by(lambda a: a.state == AlertState.OPEN)
+    active_inc = incidents_store.count_by(lambda i: i.is_active)
 
     station_summaries = []
+    readiness_by_station = _group_by_station(unit_readiness)
     for st in stations_store.values():
-        st_units = [u for u in unit_readiness if units_store.get(u["unit_id"]) and units_store[u["unit_id"]].station_id == st.station_id]
+        st_units = readiness_by_station.get(st.station_id, [])
         avg_score = (sum(u["readiness_score"] for u in st_units) / len(st_units)) if st_units else 0
         station_summaries.append({
             "station_id": st.station_id,
@@ -79,9 +92,11 @@ async def get_station(station_id: str):
 
 @router.get("/api/alerts")
 async def list_alerts(state: str | None = None):
-    alerts = list(alerts_store.values())
     if state:
-        alerts = [a for a in alerts if a.state.value == state.upper()]
+        state = state.upper()
+        alerts = [a for a in alerts_store.values() if a.state.value == state]
+    else:
+        alerts = list(alerts_store.values())
     alerts.sort(key=lambda a: a.created_at or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
     return alerts
 
@@ -114,10 +129,9 @@ async def resolve_alert(alert_id: str):
 
 @router.get("/api/incidents")
 async def list_incidents(active_only: bool = True):
-    incidents = list(incidents_store.values())
     if active_only:
-        incidents = [i for i in incidents if i.is_active]
-    return incidents
+        return [i for i in incidents_store.values() if i.is_active]
+    return list(incidents_store.values())
 
 
 @router.post("/api/incidents/{incident_id}/resolve")
@@ -153,6 +167,7 @@ async def readiness_trends():
     stations = list(stations_store.values())
     if not stations:
         return []
+    today_by_station = _group_by_station(ReadinessService.check_all_units())
 
     result = []
     for day_offset in range(13, -1, -1):
@@ -161,17 +176,10 @@ async def readiness_trends():
         total_score = 0
         count = 0
         for st in stations:
-            st_units = [u for u in units_store.values() if u.station_id == st.station_id]
-            n = len(st_units)
             base = 72 + random.randint(-8, 12) if day_offset > 0 else None
             score = base if base else None
             if day_offset == 0:
-                readiness = ReadinessService.check_all_units()
-                st_scores = [
-                    r["readiness_score"]
-                    for r in readiness
-                    if units_store.get(r["unit_id"]) and units_store[r["unit_id"]].station_id == st.station_id
-                ]
+                st_scores = [r["readiness_score"] for r in today_by_station.get(st.station_id, [])]
                 score = round(sum(st_scores) / len(st_scores), 1) if st_scores else 0
             entry[st.station_id] = score
             if score is not None:
@@ -190,12 +198,8 @@ async def certification_risk():
     rows = []
     for p in personnel_store.values():
         for cert_name, exp in p.cert_expirations.items():
-            if isinstance(exp, str):
-                try:
-                    exp = datetime.fromisoformat(exp.replace("Z", "+00:00"))
-                except Exception:
-                    continue
-            if not isinstance(exp, datetime):
+            exp = parse_expiration(exp)
+            if exp is None:
                 continue
             days_left = (exp - now).days
             if days_left <= 90:
@@ -269,9 +273,8 @@ async def simulate_staffing_gap(body: SimulationRequest):
             # Build a fake assignment set minus the removed people
             unit_obj = units_store[uid]
             fake_assignments = [
-                a for a in unit_assignments_store.values()
-                if a.unit_id == uid and a.personnel_id not in body.personnel_to_remove
-                and a.assignment_status == AssignmentStatus.ON_SHIFT
+                a for a in unit_assignments_store.lookup("on_shift_by_unit", uid)
+                if a.personnel_id not in body.personnel_to_remove
             ]
             fake_personnel = [
                 personnel_store[a.personnel_id]
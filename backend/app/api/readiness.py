@@ -1,13 +1,13 @@
 """API endpoints for emergency services readiness data models."""
-import uuid
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 
+from app.api import model_response
 from app.models import (
-    AssignmentStatus,
     AvailabilityStatus,
     Personnel,
     Unit,
@@ -15,7 +15,8 @@ from app.models import (
     Certification,
 )
 from app.stores import (
-    personnel_store, units_store, unit_assignments_store, certifications_store
+    personnel_store, units_store, unit_assignments_store, certifications_store,
+    on_shift_by_unit, new_id,
 )
 
 router = APIRouter(prefix="/api", tags=["readiness"])
@@ -24,44 +25,25 @@ router = APIRouter(prefix="/api", tags=["readiness"])
 from app.services.readiness_service import ReadinessService
 from app.services.certification_service import CertificationService
 from app.services.snowflake_service import get_snowflake_service
+from app.services.snowflake_writer import snowflake_writer
 from app.websocket.unit_readiness_manager import unit_readiness_manager
 
 
 # ---------------------------------------------------------------------------
 # Personnel Endpoints
 # ---------------------------------------------------------------------------
-@router.post("/personnel", response_model=Personnel)
+@router.post("/personnel", response_model=None, responses=model_response(Personnel))
 async def create_personnel(profile: Personnel) -> Personnel:
     """Create a new personnel profile."""
     try:
-        personnel_id = str(uuid.uuid4())
+        personnel_id = new_id()
         profile.personnel_id = personnel_id
-        profile.last_check_in = profile.last_check_in or datetime.utcnow()
-        
-        # Ensure cert_expirations are datetime objects (validator should handle this, but double-check)
-        if profile.cert_expirations:
-            normalized_expirations = {}
-            for cert_name, exp_date in profile.cert_expirations.items():
-                if isinstance(exp_date, str):
-                    try:
-                        if exp_date.endswith('Z'):
-                            exp_date = exp_date.replace('Z', '+00:00')
-                        if 'T' in exp_date:
-                            normalized_expirations[cert_name] = datetime.fromisoformat(exp_date)
-                        else:
-                            normalized_expirations[cert_name] = datetime.fromisoformat(exp_date + 'T23:59:59+00:00')
-                    except (ValueError, AttributeError):
-                        # Keep as string if parsing fails
-                        normalized_expirations[cert_name] = exp_date
-                else:
-                    normalized_expirations[cert_name] = exp_date
-            profile.cert_expirations = normalized_expirations
+        profile.last_check_in = profile.last_check_in or datetime.now(timezone.utc)
         
         personnel_store[personnel_id] = profile
         
-        # Insert into Snowflake (non-blocking)
-        snowflake_service = get_snowflake_service()
-        snowflake_service.insert_personnel(profile)
+        # Queue for batched Snowflake load
+        await snowflake_writer.put("personnel", profile)
         
         return profile
     except Exception as e:
@@ -78,12 +60,9 @@ async def list_personnel(
     )
 ) -> List[Personnel]:
     """List personnel, optionally filtered by availability."""
-    people = list(personnel_store.values())
     if availability_status:
-        people = [
-            p for p in people if p.availability_status == availability_status
-        ]
-    return people
+        return personnel_store.lookup("by_status", availability_status)
+    return list(personnel_store.values())
 
 
 @router.get("/personnel/{personnel_id}", response_model=Personnel)
@@ -95,7 +74,7 @@ async def get_personnel(personnel_id: str) -> Personnel:
     return person
 
 
-@router.put("/personnel/{personnel_id}", response_model=Personnel)
+@router.put("/personnel/{personnel_id}", response_model=None, responses=model_response(Personnel))
 async def update_personnel(personnel_id: str, profile: Personnel) -> Personnel:
     """Update an existing personnel profile."""
     if personnel_id not in personnel_store:
@@ -105,9 +84,8 @@ async def update_personnel(personnel_id: str, profile: Personnel) -> Personnel:
     profile.last_check_in = profile.last_check_in or personnel_store[personnel_id].last_check_in
     personnel_store[personnel_id] = profile
     
-    # Update in Snowflake (non-blocking)
-    snowflake_service = get_snowflake_service()
-    snowflake_service.insert_personnel(profile)
+    # Queue for batched Snowflake load
+    await snowflake_writer.put("personnel", profile)
     
     return profile
 
@@ -115,16 +93,15 @@ async def update_personnel(personnel_id: str, profile: Personnel) -> Personnel:
 # ---------------------------------------------------------------------------
 # Unit Endpoints
 # ---------------------------------------------------------------------------
-@router.post("/units", response_model=Unit)
+@router.post("/units", response_model=None, responses=model_response(Unit))
 async def create_unit(unit: Unit) -> Unit:
     """Create an emergency response unit."""
-    unit_id = str(uuid.uuid4())
+    unit_id = new_id()
     unit.unit_id = unit_id
     units_store[unit_id] = unit
     
-    # Insert into Snowflake (non-blocking)
-    snowflake_service = get_snowflake_service()
-    snowflake_service.insert_unit(unit)
+    # Queue for batched Snowflake load
+    await snowflake_writer.put("units", unit)
     
     return unit
 
@@ -132,10 +109,9 @@ async def create_unit(unit: Unit) -> Unit:
 @router.get("/units", response_model=List[Unit])
 async def list_units(unit_type: str | None = Query(None, description="Filter by unit type")) -> List[Unit]:
     """List units, optionally filtered by type."""
-    units = list(units_store.values())
     if unit_type:
-        units = [u for u in units if u.type == unit_type]
-    return units
+        return units_store.lookup("by_type", unit_type)
+    return list(units_store.values())
 
 
 @router.get("/units/{unit_id}", response_model=Unit)
@@ -147,7 +123,7 @@ async def get_unit(unit_id: str) -> Unit:
     return unit
 
 
-@router.put("/units/{unit_id}", response_model=Unit)
+@router.put("/units/{unit_id}", response_model=None, responses=model_response(Unit))
 async def update_unit(unit_id: str, unit: Unit) -> Unit:
     """Update an existing unit definition."""
     if unit_id not in units_store:
@@ -156,9 +132,8 @@ async def update_unit(unit_id: str, unit: Unit) -> Unit:
     unit.unit_id = unit_id
     units_store[unit_id] = unit
     
-    # Update in Snowflake (non-blocking)
-    snowflake_service = get_snowflake_service()
-    snowflake_service.insert_unit(unit)
+    # Queue for batched Snowflake load
+    await snowflake_writer.put("units", unit)
     
     return unit
 
@@ -166,7 +141,7 @@ async def update_unit(unit_id: str, unit: Unit) -> Unit:
 # ---------------------------------------------------------------------------
 # Unit Assignment Endpoints
 # ---------------------------------------------------------------------------
-@router.post("/unit-assignments", response_model=UnitAssignment)
+@router.post("/unit-assignments", response_model=None, responses=model_response(UnitAssignment))
 async def assign_personnel_to_unit(assignment: UnitAssignment) -> UnitAssignment:
     """Assign personnel to a unit for a given shift window."""
     if assignment.shift_end <= assignment.shift_start:
@@ -181,16 +156,17 @@ async def assign_personnel_to_unit(assignment: UnitAssignment) -> UnitAssignment
         raise HTTPException(status_code=404, detail="Personnel not found")
 
     # Validate certifications
-    missing_required = [
-        cert for cert in unit.required_certifications if cert not in personnel.certifications
-    ]
-    if missing_required:
+    if not unit.required_cert_set <= personnel.cert_set:
+        # Keep the unit's ordering for the error message
+        missing_required = [
+            cert for cert in unit.required_certifications if cert not in personnel.cert_set
+        ]
         raise HTTPException(
             status_code=400,
             detail=f"Personnel missing required certifications: {', '.join(missing_required)}",
         )
 
-    assignment_id = str(uuid.uuid4())
+    assignment_id = new_id()
     assignment.assignment_id = assignment_id
     unit_assignments_store[assignment_id] = assignment
 
@@ -199,13 +175,12 @@ async def assign_personnel_to_unit(assignment: UnitAssignment) -> UnitAssignment
     personnel.availability_status = AvailabilityStatus.DEPLOYED
     personnel_store[personnel.personnel_id] = personnel
 
-    # Insert into Snowflake (non-blocking)
-    snowflake_service = get_snowflake_service()
-    snowflake_service.insert_unit_assignment(assignment)
-    snowflake_service.insert_personnel(personnel)  # Update personnel record
+    # Queue for batched Snowflake load
+    await snowflake_writer.put("unit_assignments", assignment)
+    await snowflake_writer.put("personnel", personnel)  # Update personnel record
 
-    # Broadcast readiness update via WebSocket
-    asyncio.create_task(unit_readiness_manager.broadcast_unit_readiness(unit.unit_id))
+    # Broadcast readiness update via WebSocket (coalesced per unit)
+    unit_readiness_manager.enqueue(unit.unit_id)
 
     return assignment
 
@@ -216,21 +191,27 @@ async def list_unit_assignments(
     personnel_id: str | None = Query(None, description="Filter by personnel"),
 ) -> List[UnitAssignment]:
     """List unit assignments with optional filtering."""
-    assignments = list(unit_assignments_store.values())
+    if unit_id and personnel_id:
+        # Walk the smaller (insertion-ordered) bucket and filter on the other field
+        if len(unit_assignments_store.ids_for("by_unit", unit_id)) <= len(unit_assignments_store.ids_for("by_personnel", personnel_id)):
+            return [a for a in unit_assignments_store.lookup("by_unit", unit_id) if a.personnel_id == personnel_id]
+        return [a for a in unit_assignments_store.lookup("by_personnel", personnel_id) if a.unit_id == unit_id]
     if unit_id:
-        assignments = [a for a in assignments if a.unit_id == unit_id]
+        return unit_assignments_store.lookup("by_unit", unit_id)
     if personnel_id:
-        assignments = [a for a in assignments if a.personnel_id == personnel_id]
-    return assignments
+        return unit_assignments_store.lookup("by_personnel", personnel_id)
+    return list(unit_assignments_store.values())
 
 
 # ---------------------------------------------------------------------------
 # Readiness & Status Endpoints
 # ---------------------------------------------------------------------------
+# Readiness dicts hold only JSON-native values, so they are handed to orjson
+# directly instead of going through FastAPI's jsonable_encoder first
 @router.get("/readiness/units")
 async def get_all_units_readiness():
     """Get readiness status for all units."""
-    return ReadinessService.check_all_units()
+    return ORJSONResponse(ReadinessService.check_all_units())
 
 
 @router.get("/readiness/units/{unit_id}")
@@ -239,7 +220,7 @@ async def get_unit_readiness(unit_id: str):
     readiness = ReadinessService.get_unit_readiness(unit_id)
     if not readiness:
         raise HTTPException(status_code=404, detail="Unit not found")
-    return readiness
+    return ORJSONResponse(readiness)
 
 
 @router.get("/readiness/units/{unit_id}/history")
@@ -249,7 +230,7 @@ async def get_unit_readiness_history(
 ):
     """Get readiness history for a unit from Snowflake analytics."""
     snowflake_service = get_snowflake_service()
-    history = snowflake_service.get_unit_readiness_history(unit_id, days)
+    history = await asyncio.to_thread(snowflake_service.get_unit_readiness_history, unit_id, days)
     return {
         "unit_id": unit_id,
         "days": days,
@@ -282,19 +263,16 @@ async def check_and_mark_expired():
     """
     marked_count = CertificationService.mark_personnel_unqualified()
     
-    # Broadcast readiness updates for affected units
-    affected_units = set()
-    for assignment in unit_assignments_store.values():
-        if assignment.assignment_status == AssignmentStatus.ON_SHIFT:
-            affected_units.add(assignment.unit_id)
+    # Broadcast readiness updates for units with anyone on shift
+    affected_units = list(on_shift_by_unit)
     
-    # Trigger readiness broadcasts
+    # Trigger readiness broadcasts (coalesced per unit)
     for unit_id in affected_units:
-        asyncio.create_task(unit_readiness_manager.broadcast_unit_readiness(unit_id))
+        unit_readiness_manager.enqueue(unit_id)
     
     return {
         "marked_unqualified": marked_count,
-        "affected_units": list(affected_units),
+        "affected_units": affected_units,
         "message": f"Marked {marked_count} personnel as unqualified due to expired certifications"
     }
 
@@ -302,10 +280,10 @@ async def check_and_mark_expired():
 # ---------------------------------------------------------------------------
 # Certification Management Endpoints
 # ---------------------------------------------------------------------------
-@router.post("/certifications", response_model=Certification)
+@router.post("/certifications", response_model=None, responses=model_response(Certification))
 async def create_certification(certification: Certification) -> Certification:
     """Create a new certification definition."""
-    certification_id = str(uuid.uuid4())
+    certification_id = new_id()
     certification.certification_id = certification_id
     certifications_store[certification_id] = certification
     return certification
@@ -316,10 +294,9 @@ async def list_certifications(
     category: str | None = Query(None, description="Filter by category")
 ) -> List[Certification]:
     """List all certification definitions."""
-    certs = list(certifications_store.values())
     if category:
-        certs = [c for c in certs if c.category == category]
-    return certs
+        return certifications_store.lookup("by_category", category)
+    return list(certifications_store.values())
 
 
 @router.get("/certifications/{certification_id}", response_model=Certification)
@@ -331,7 +308,7 @@ async def get_certification(certification_id: str) -> Certification:
     return cert
 
 
-@router.put("/certifications/{certification_id}", response_model=Certification)
+@router.put("/certifications/{certification_id}", response_model=None, responses=model_response(Certification))
 async def update_certification(certification_id: str, certification: Certification) -> Certification:
     """Update an existing certification definition."""
     if certification_id not in certifications_store:
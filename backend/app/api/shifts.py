@@ -1,21 +1,20 @@
 """REST API endpoints for shifts and employees."""
+import asyncio
 import logging
-import uuid
-from datetime import datetime, date
+import time
+from collections import defaultdict
+from datetime import datetime, date, timezone
 from typing import List
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import select
-import sqlalchemy as sa
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import TypeAdapter
 
+from app.api import model_response
 from app.models import (
     Employee, Shift, ShiftAssignment, ShiftEvent, 
     ClockInRequest, ClockOutRequest, LiveShiftStatus, CoverageSummary
 )
-from app.config import settings
-from app.websocket.manager import websocket_manager
-from app.services.kafka_service import get_kafka_service
+from app.stores import new_id
+from app.services.event_bus import event_bus
 from app.services.snowflake_service import get_snowflake_service
 from app.models import EventType
 
@@ -23,99 +22,100 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["shifts"])
 
-# Database setup (SQLite for development)
-engine = create_async_engine(settings.database_url, echo=False)
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-
 # In-memory stores for MVP (will be replaced with proper DB tables)
 employees_store: dict[str, Employee] = {}
 shifts_store: dict[str, Shift] = {}
 assignments_store: dict[str, ShiftAssignment] = {}
 clock_ins: dict[str, set[str]] = {}  # shift_id -> set of employee_ids
+_NO_CLOCK_INS: frozenset[str] = frozenset()  # shared default for shifts without clock-ins
+assignments_by_shift: defaultdict[str, int] = defaultdict(int)  # shift_id -> assignment count
+shifts_by_date: defaultdict[date, list[str]] = defaultdict(list)  # start date -> shift_ids
+shift_alert_state: dict[str, str] = {}  # shift_id -> "understaffed" | "ok" as of the last clock-in
 
+# Encoded GET /employees and GET /shifts bodies; reset whenever the store gains a record
+_employees_json_cache: bytes | None = None
+_shifts_json_cache: bytes | None = None
+_employee_list = TypeAdapter(List[Employee])
+_shift_list = TypeAdapter(List[Shift])
 
-async def get_db():
-    """Dependency for database session."""
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+# Last real Snowflake health probe: (monotonic time, response)
+HEALTH_CACHE_TTL = 5.0  # seconds
+_health_cache: tuple[float, dict] | None = None
 
 
 async def _emit_shift_event(
     shift_id: str,
     event_type: EventType,
     employee_id: str = None,
-    payload: dict = None
+    payload: dict = None,
+    event_time: datetime = None,
 ):
-    """Helper to emit shift events to Kafka, Snowflake, and WebSocket."""
+    """Helper to emit shift events to Kafka, Snowflake, and WebSocket (queued, non-blocking)."""
     event = ShiftEvent(
-        event_id=str(uuid.uuid4()),
+        event_id=new_id(),
         shift_id=shift_id,
         employee_id=employee_id,
         event_type=event_type,
-        event_time=datetime.utcnow(),
+        event_time=event_time or datetime.now(timezone.utc),
         payload=payload or {},
     )
     
-    # 1. Produce to Kafka (non-blocking)
-    kafka_service = get_kafka_service()
-    kafka_service.produce_shift_event(event)
-    
-    # 2. Insert to Snowflake (non-blocking)
-    snowflake_service = get_snowflake_service()
-    snowflake_service.insert_shift_event(event)
-    
-    # 3. Broadcast via WebSocket (async)
-    try:
-        await websocket_manager.broadcast_event(event)
-    except Exception as e:
-        logger.error(f"Error broadcasting WebSocket event: {e}")
+    # Kafka, Snowflake and WebSocket delivery happen on the event bus consumers
+    event_bus.publish(event)
 
 
-@router.post("/employees", response_model=Employee)
+@router.post("/employees", response_model=None, responses=model_response(Employee))
 async def create_employee(employee: Employee):
     """Create a new employee."""
-    employee_id = str(uuid.uuid4())
+    global _employees_json_cache
+    employee_id = new_id()
     employee.employee_id = employee_id
-    employee.hire_date = employee.hire_date or datetime.utcnow()
+    employee.hire_date = employee.hire_date or datetime.now(timezone.utc)
     employees_store[employee_id] = employee
+    _employees_json_cache = None
     
-    logger.info(f"Created employee: {employee_id} - {employee.name}")
+    logger.info("Created employee: %s - %s", employee_id, employee.name)
     return employee
 
 
 @router.get("/employees", response_model=List[Employee])
 async def list_employees():
     """List all employees."""
-    return list(employees_store.values())
+    global _employees_json_cache
+    if _employees_json_cache is None:
+        _employees_json_cache = _employee_list.dump_json(list(employees_store.values()))
+    return Response(content=_employees_json_cache, media_type="application/json")
 
 
-@router.post("/shifts", response_model=Shift)
+@router.post("/shifts", response_model=None, responses=model_response(Shift))
 async def create_shift(shift: Shift):
     """Create a new shift."""
-    shift_id = str(uuid.uuid4())
+    global _shifts_json_cache
+    shift_id = new_id()
     shift.shift_id = shift_id
-    shift.created_at = datetime.utcnow()
+    shift.created_at = datetime.now(timezone.utc)
     shifts_store[shift_id] = shift
+    _shifts_json_cache = None
+    shifts_by_date[shift.start_time.date()].append(shift_id)
     clock_ins[shift_id] = set()
     
     # Emit CREATED event
-    await _emit_shift_event(shift_id, EventType.CREATED)
+    await _emit_shift_event(shift_id, EventType.CREATED, event_time=shift.created_at)
     
-    logger.info(f"Created shift: {shift_id} at {shift.location}")
+    logger.info("Created shift: %s at %s", shift_id, shift.location)
     return shift
 
 
 @router.get("/shifts", response_model=List[Shift])
 async def list_shifts():
     """List all shifts."""
-    return list(shifts_store.values())
+    global _shifts_json_cache
+    if _shifts_json_cache is None:
+        _shifts_json_cache = _shift_list.dump_json(list(shifts_store.values()))
+    return Response(content=_shifts_json_cache, media_type="application/json")
 
 
-@router.post("/shifts/{shift_id}/assign", response_model=ShiftAssignment)
+@router.post("/shifts/{shift_id}/assign", response_model=None, responses=model_response(ShiftAssignment))
 async def assign_employee_to_shift(shift_id: str, employee_id: str):
     """Assign an employee to a shift."""
     if shift_id not in shifts_store:
@@ -123,49 +123,52 @@ async def assign_employee_to_shift(shift_id: str, employee_id: str):
     if employee_id not in employees_store:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    assignment_id = str(uuid.uuid4())
+    assignment_id = new_id()
     assignment = ShiftAssignment(
         assignment_id=assignment_id,
         shift_id=shift_id,
         employee_id=employee_id,
-        assigned_at=datetime.utcnow(),
+        assigned_at=datetime.now(timezone.utc),
     )
     assignments_store[assignment_id] = assignment
+    assignments_by_shift[shift_id] += 1
     
     # Emit ASSIGNED event
-    await _emit_shift_event(shift_id, EventType.ASSIGNED, employee_id)
+    await _emit_shift_event(shift_id, EventType.ASSIGNED, employee_id, event_time=assignment.assigned_at)
     
-    logger.info(f"Assigned employee {employee_id} to shift {shift_id}")
+    logger.debug("Assigned employee %s to shift %s", employee_id, shift_id)
     return assignment
 
 
 @router.post("/shifts/{shift_id}/clock-in")
 async def clock_in(shift_id: str, request: ClockInRequest):
     """Clock in an employee for a shift."""
-    if shift_id not in shifts_store:
+    shift = shifts_store.get(shift_id)
+    if shift is None:
         raise HTTPException(status_code=404, detail="Shift not found")
     if request.employee_id not in employees_store:
         raise HTTPException(status_code=404, detail="Employee not found")
     
     # Add to clock-ins
-    if shift_id not in clock_ins:
-        clock_ins[shift_id] = set()
-    clock_ins[shift_id].add(request.employee_id)
+    clocked_in = clock_ins.setdefault(shift_id, set())
+    clocked_in.add(request.employee_id)
     
     # Emit CLOCK_IN event
     await _emit_shift_event(shift_id, EventType.CLOCK_IN, request.employee_id)
     
     # Check for understaffing
-    shift = shifts_store[shift_id]
-    current_count = len(clock_ins[shift_id])
-    if current_count < shift.required_headcount:
+    current_count = len(clocked_in)
+    new_state = "understaffed" if current_count < shift.required_headcount else "ok"
+    # Alert once when the shift becomes understaffed, not on every clock-in below headcount
+    if new_state == "understaffed" and shift_alert_state.get(shift_id) != "understaffed":
         await _emit_shift_event(
             shift_id,
             EventType.ALERT_UNDERSTAFFED,
             payload={"current_count": current_count, "required": shift.required_headcount}
         )
+    shift_alert_state[shift_id] = new_state
     
-    logger.info(f"Employee {request.employee_id} clocked in to shift {shift_id}")
+    logger.debug("Employee %s clocked in to shift %s", request.employee_id, shift_id)
     return {"status": "clocked_in", "shift_id": shift_id, "employee_id": request.employee_id}
 
 
@@ -182,7 +185,7 @@ async def clock_out(shift_id: str, request: ClockOutRequest):
     # Emit CLOCK_OUT event
     await _emit_shift_event(shift_id, EventType.CLOCK_OUT, request.employee_id)
     
-    logger.info(f"Employee {request.employee_id} clocked out from shift {shift_id}")
+    logger.debug("Employee %s clocked out from shift %s", request.employee_id, shift_id)
     return {"status": "clocked_out", "shift_id": shift_id, "employee_id": request.employee_id}
 
 
@@ -192,13 +195,11 @@ async def get_live_shifts():
     today = date.today()
     live_statuses = []
     
-    for shift_id, shift in shifts_store.items():
-        # Only show shifts for today
-        if shift.start_time.date() != today:
-            continue
-        
-        assigned_count = len([a for a in assignments_store.values() if a.shift_id == shift_id])
-        clocked_in_count = len(clock_ins.get(shift_id, set()))
+    # Only show shifts for today
+    for shift_id in shifts_by_date.get(today, ()):
+        shift = shifts_store[shift_id]
+        assigned_count = assignments_by_shift.get(shift_id, 0)
+        clocked_in_count = len(clock_ins.get(shift_id, _NO_CLOCK_INS))
         
         # Determine status
         if clocked_in_count < shift.required_headcount:
@@ -234,14 +235,14 @@ async def get_coverage_analytics(target_date: date = None):
     if target_date is None:
         target_date = date.today()
     
-    logger.info(f"Fetching coverage analytics for date: {target_date}")
+    logger.debug("Fetching coverage analytics for date: %s", target_date)
     
     try:
         snowflake_service = get_snowflake_service()
 
-        coverage = snowflake_service.get_shift_coverage_summary(target_date)
+        coverage = await asyncio.to_thread(snowflake_service.get_shift_coverage_summary, target_date)
         
-        logger.info(f"Retrieved {len(coverage)} coverage records from Snowflake for {target_date}")
+        logger.debug("Retrieved %d coverage records from Snowflake for %s", len(coverage), target_date)
         
         # Return results (empty list is valid - means no data for that date)
         return coverage
@@ -264,7 +265,8 @@ async def populate_analytics():
                 detail="Snowflake connection not available"
             )
         
-        success = snowflake_service.populate_coverage_from_assignments()
+        # One set-based MERGE inside Snowflake; run it off the event loop
+        success = await asyncio.to_thread(snowflake_service.populate_coverage_from_assignments)
         
         if success:
             return {
@@ -289,6 +291,7 @@ async def populate_analytics():
 @router.get("/analytics/health")
 async def analytics_health():
     """Check if Snowflake analytics connection is working."""
+    global _health_cache
     try:
         snowflake_service = get_snowflake_service()
         
@@ -327,14 +330,16 @@ async def analytics_health():
                 "service_type": "real"
             }
         
+        # Probes are polled frequently; reuse a recent result instead of a round trip
+        now = time.monotonic()
+        if _health_cache and now - _health_cache[0] < HEALTH_CACHE_TTL:
+            return _health_cache[1]
+        
         # Try a simple query to verify connection
         try:
-            cursor = snowflake_service.conn.cursor()
-            cursor.execute("SELECT CURRENT_TIMESTAMP(), CURRENT_DATABASE(), CURRENT_SCHEMA()")
-            result = cursor.fetchone()
-            cursor.close()
+            result = await asyncio.to_thread(snowflake_service.ping)
             
-            return {
+            health = {
                 "status": "connected",
                 "message": "Snowflake connection is active",
                 "configured": True,
@@ -345,12 +350,14 @@ async def analytics_health():
             }
         except Exception as conn_error:
             logger.error(f"Error executing test query: {conn_error}")
-            return {
+            health = {
                 "status": "error",
                 "message": f"Connection exists but query failed: {str(conn_error)}",
                 "configured": True,
                 "service_type": "real"
             }
+        _health_cache = (now, health)
+        return health
         
     except Exception as e:
         logger.error(f"Error checking Snowflake health: {e}", exc_info=True)
@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     kafka_username: str = "placeholder"
     kafka_password: str = "placeholder"
     kafka_topic: str = "shift_events"
+    kafka_auto_create_topics: bool = True  # set false where infra provisions topics
     
     # Snowflake Configuration (optional - uses mock service if not provided)
     # Get account identifier from Snowflake UI: Username → Account
@@ -22,6 +23,7 @@ class Settings(BaseSettings):
     snowflake_warehouse: str = "COMPUTE_WH"
     snowflake_database: str = "WORKFORCE_DB"
     snowflake_schema: str = "RAW"
+    snowflake_pool_size: int = 4  # max concurrent Snowflake sessions per process
     
     # Application Configuration
     jwt_secret: str = "dev-secret-key-change-in-production"
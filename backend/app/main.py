@@ -1,26 +1,59 @@
 """FastAPI application — Emergency Readiness Platform."""
-import json
+import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
+import time
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.config import settings
+from app.models import AlertState
+from app.stores import alerts_store, incidents_store
 from app.api import shifts
 from app.api import readiness
 from app.api import operations
 from app.websocket.manager import websocket_manager
 from app.websocket.unit_readiness_manager import unit_readiness_manager
 from app.services.demo_service import seed_demo
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+from app.services.readiness_service import ReadinessService
+from app.services.event_bus import event_bus
+from app.services.kafka_service import get_kafka_service
+from app.services.snowflake_service import get_snowflake_service
+from app.services.snowflake_writer import snowflake_writer
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records as-is; the listener thread does all formatting and I/O.
+
+    The stock ``prepare`` formats each record on the logging thread, which is
+    the work this handler exists to move off the request path. Log arguments
+    must therefore not be mutated after the call (the app only logs immutable
+    values and snapshots).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# Handlers only enqueue records; a listener thread does the formatting I/O
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+_queue_handler = _DeferredQueueHandler(_log_queue)
+log_listener = logging.handlers.QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Emergency Readiness Platform API",
     description="Real-time emergency staffing, readiness, and certification risk with Kafka and Snowflake.",
     version="2.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -40,6 +73,31 @@ app.include_router(operations.router)
 async def startup():
     counts = seed_demo()
     logger.info(f"Demo data seeded: {counts}")
+    # Resolve the service singletons before traffic so no request pays for connecting
+    await asyncio.to_thread(get_snowflake_service)
+    kafka_service = await asyncio.to_thread(get_kafka_service)
+    if settings.kafka_auto_create_topics:
+        # Topic metadata can take seconds; check it in the background instead of gating boot
+        asyncio.get_running_loop().run_in_executor(None, kafka_service.ensure_topic_exists)
+    snowflake_writer.start()
+    event_bus.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Hand queued shift events to their sinks before flushing those sinks
+    await event_bus.stop()
+    # Let queued WebSocket frames go out before the connections are dropped
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(websocket_manager.flush(), unit_readiness_manager.flush()),
+            timeout=5,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Timed out flushing WebSocket outboxes on shutdown")
+    await snowflake_writer.stop()
+    # Every queued row is loaded by now; release the pooled Snowflake sessions
+    await asyncio.to_thread(get_snowflake_service().close)
 
 
 @app.get("/")
@@ -77,43 +135,61 @@ async def websocket_unit_readiness(websocket: WebSocket, unit_id: str):
         unit_readiness_manager.disconnect(websocket)
 
 
+# Seconds between /ws/operations pushes; connections within one tick share a payload
+OPERATIONS_TICK = 10
+_operations_payload: tuple[float, str] | None = None
+
+
+def _build_operations_payload(fresh: bool = False) -> str:
+    """
+    Dashboard summary frame for /ws/operations, computed and encoded once per tick.
+
+    ``fresh`` recomputes it regardless (for a client's first frame); the result
+    replaces the shared one, so later ticks never go back to older state.
+    """
+    global _operations_payload
+    now = time.monotonic()
+    if not fresh and _operations_payload and now - _operations_payload[0] < OPERATIONS_TICK:
+        return _operations_payload[1]
+
+    unit_readiness = ReadinessService.check_all_units()
+    total = len(unit_readiness)
+    ready = sum(1 for u in unit_readiness if u["readiness_score"] >= 85)
+    open_alerts = [
+        {"alert_id": a.alert_id, "alert_type": a.alert_type, "message": a.message, "state": a.state}
+        for a in alerts_store.values()
+        if a.state == AlertState.OPEN
+    ]
+    active_incidents = [
+        {"incident_id": i.incident_id, "title": i.title, "priority": i.priority, "station_id": i.station_id}
+        for i in incidents_store.values()
+        if i.is_active
+    ]
+    payload = {
+        "type": "dashboard_summary",
+        "data": {
+            "total_units": total,
+            "ready_units": ready,
+            "open_alerts": len(open_alerts),
+            "active_incidents": len(active_incidents),
+            "alerts": open_alerts,
+            "incidents": active_incidents,
+        },
+    }
+    _operations_payload = (now, orjson.dumps(payload).decode())
+    return _operations_payload[1]
+
+
 @app.websocket("/ws/operations")
 async def websocket_operations(websocket: WebSocket):
     """Aggregated operations channel for dashboard summaries, alerts, and incidents."""
-    from app.stores import alerts_store, incidents_store
-    from app.models import AlertState
-    from app.services.readiness_service import ReadinessService
-    import asyncio
-
     await websocket.accept()
     try:
+        # First frame reflects current state; periodic frames share the per-tick payload
+        await websocket.send_text(_build_operations_payload(fresh=True))
         while True:
-            unit_readiness = ReadinessService.check_all_units()
-            total = len(unit_readiness)
-            ready = sum(1 for u in unit_readiness if u["readiness_score"] >= 85)
-            open_alerts = [
-                {"alert_id": a.alert_id, "alert_type": a.alert_type, "message": a.message, "state": a.state}
-                for a in alerts_store.values()
-                if a.state == AlertState.OPEN
-            ]
-            active_incidents = [
-                {"incident_id": i.incident_id, "title": i.title, "priority": i.priority, "station_id": i.station_id}
-                for i in incidents_store.values()
-                if i.is_active
-            ]
-            payload = {
-                "type": "dashboard_summary",
-                "data": {
-                    "total_units": total,
-                    "ready_units": ready,
-                    "open_alerts": len(open_alerts),
-                    "active_incidents": len(active_incidents),
-                    "alerts": open_alerts,
-                    "incidents": active_incidents,
-                },
-            }
-            await websocket.send_text(json.dumps(payload))
-            await asyncio.sleep(10)
+            await asyncio.sleep(OPERATIONS_TICK)
+            await websocket.send_text(_build_operations_payload())
     except WebSocketDisconnect:
         pass
     except Exception as exc:
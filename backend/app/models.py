@@ -1,7 +1,8 @@
 """Pydantic models for the Emergency Readiness platform."""
 from pydantic import BaseModel, Field, field_validator
-from datetime import datetime
-from typing import Optional, List, Dict, Union
+from datetime import datetime, timezone
+from functools import cached_property, lru_cache
+from typing import Optional, List, Dict, FrozenSet, Union
 from enum import Enum
 
 
@@ -127,6 +128,18 @@ class Personnel(BaseModel):
     current_unit_id: Optional[str] = None
     notes: Optional[str] = None
 
+    @cached_property
+    def cert_set(self) -> FrozenSet[str]:
+        """
+        Held certifications as a set for O(1) membership checks.
+
+        Computed once per instance and not refreshed: ``certifications`` must not
+        be mutated or reassigned afterwards, and ``model_copy(update=...)``
+        must not change it (the copy would carry the stale set). Build a new
+        ``Personnel`` instead, as the API handlers do.
+        """
+        return frozenset(self.certifications)
+
     @field_validator('cert_expirations', mode='before')
     @classmethod
     def parse_cert_expirations(cls, v):
@@ -136,12 +149,9 @@ class Personnel(BaseModel):
         for cert_name, exp_date in v.items():
             if isinstance(exp_date, str):
                 try:
-                    if exp_date.endswith('Z'):
-                        exp_date = exp_date.replace('Z', '+00:00')
-                    if 'T' in exp_date:
-                        result[cert_name] = datetime.fromisoformat(exp_date)
-                    else:
-                        result[cert_name] = datetime.fromisoformat(exp_date + 'T23:59:59+00:00')
+                    # fromisoformat accepts a trailing 'Z' on 3.11+; bare dates expire end of day UTC
+                    candidate = exp_date if 'T' in exp_date else exp_date + 'T23:59:59+00:00'
+                    result[cert_name] = datetime.fromisoformat(candidate)
                 except (ValueError, AttributeError, TypeError) as e:
                     import logging
                     logging.getLogger(__name__).warning(
@@ -158,6 +168,30 @@ class Personnel(BaseModel):
         from_attributes = True
 
 
+@lru_cache(maxsize=16384)
+def _parse_iso(value: str) -> Optional[datetime]:
+    """Parse an ISO-8601 string once; unparseable strings are remembered as None."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_expiration(value: Union[datetime, str]) -> Optional[datetime]:
+    """
+    Timezone-aware datetime for a ``cert_expirations`` value (naive times are UTC).
+
+    Values are normally datetimes already (the Personnel validator parses them);
+    strings that slipped through are parsed via a memoized helper.
+    """
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, str):
+        return _parse_iso(value)
+    return None
+
+
 class Unit(BaseModel):
     unit_id: Optional[str] = None
     unit_name: str
@@ -166,6 +200,17 @@ class Unit(BaseModel):
     required_certifications: List[str] = Field(default_factory=list)
     station_id: Optional[str] = None
 
+    @cached_property
+    def required_cert_set(self) -> FrozenSet[str]:
+        """
+        Required certifications as a set.
+
+        Computed once per instance and not refreshed: ``required_certifications``
+        must not be mutated or reassigned afterwards, and ``model_copy(update=...)``
+        must not change it. Build a new ``Unit`` instead, as the API handlers do.
+        """
+        return frozenset(self.required_certifications)
+
     class Config:
         from_attributes = True
 
@@ -1,9 +1,9 @@
 """Service for managing certification expirations and alerts."""
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict
-from app.models import Personnel
-from app.stores import personnel_store
+from typing import Dict, List
+from app.models import AvailabilityStatus
+from app.stores import personnel_store, cert_expiry_index
 
 logger = logging.getLogger(__name__)
 
@@ -20,57 +20,42 @@ class CertificationService:
             days_ahead: Number of days to look ahead (default 30)
             
         Returns:
-            List of dicts with personnel and expiring cert info
+            List of dicts with personnel and expiring cert info, soonest first
         """
-        expiring = []
-        cutoff_date = datetime.now(timezone.utc) + timedelta(days=days_ahead)
+        now = datetime.now(timezone.utc)
+        cutoff_date = now + timedelta(days=days_ahead)
         
-        for person in personnel_store.values():
-            for cert_name, exp_date in person.cert_expirations.items():
-                if isinstance(exp_date, str):
-                    try:
-                        exp_date = datetime.fromisoformat(exp_date.replace('Z', '+00:00'))
-                    except:
-                        continue
-                
-                if isinstance(exp_date, datetime):
-                    if exp_date <= cutoff_date:
-                        days_until_expiry = (exp_date - datetime.now(timezone.utc)).days
-                        expiring.append({
-                            "personnel_id": person.personnel_id,
-                            "name": person.name,
-                            "certification": cert_name,
-                            "expiration_date": exp_date.isoformat(),
-                            "days_until_expiry": days_until_expiry,
-                            "is_expired": days_until_expiry < 0,
-                        })
+        expiring = []
+        # Range query on the expiration index: only entries up to the cutoff are visited
+        for exp_date, personnel_id, cert_name in cert_expiry_index.through(cutoff_date):
+            person = personnel_store[personnel_id]
+            days_until_expiry = (exp_date - now).days
+            expiring.append({
+                "personnel_id": person.personnel_id,
+                "name": person.name,
+                "certification": cert_name,
+                "expiration_date": exp_date.isoformat(),
+                "days_until_expiry": days_until_expiry,
+                "is_expired": days_until_expiry < 0,
+            })
         
         return expiring
     
     @staticmethod
     def check_expired_certifications() -> List[Dict]:
-        """Find all expired certifications."""
-        expired = []
+        """Find all expired certifications, oldest first."""
         now = datetime.now(timezone.utc)
         
-        for person in personnel_store.values():
-            for cert_name, exp_date in person.cert_expirations.items():
-                if isinstance(exp_date, str):
-                    try:
-                        exp_date = datetime.fromisoformat(exp_date.replace('Z', '+00:00'))
-                    except:
-                        continue
-                
-                if isinstance(exp_date, datetime) and exp_date < now:
-                    expired.append({
-                        "personnel_id": person.personnel_id,
-                        "name": person.name,
-                        "certification": cert_name,
-                        "expiration_date": exp_date.isoformat(),
-                        "days_expired": (now - exp_date).days,
-                    })
-        
-        return expired
+        return [
+            {
+                "personnel_id": personnel_id,
+                "name": personnel_store[personnel_id].name,
+                "certification": cert_name,
+                "expiration_date": exp_date.isoformat(),
+                "days_expired": (now - exp_date).days,
+            }
+            for exp_date, personnel_id, cert_name in cert_expiry_index.before(now)
+        ]
     
     @staticmethod
     def mark_personnel_unqualified() -> int:
@@ -96,7 +81,7 @@ class CertificationService:
         for personnel_id, expired_certs in personnel_expired.items():
             person = personnel_store.get(personnel_id)
             if person:
-                person.availability_status = "OFF"
+                person.availability_status = AvailabilityStatus.OFF
                 person.notes = f"Unqualified: Expired certifications: {', '.join(expired_certs)}"
                 personnel_store[personnel_id] = person
                 marked_count += 1
@@ -1,5 +1,5 @@
 """Deterministic demo seed for Ridgecrest Emergency Services District."""
-import uuid
+import secrets
 import logging
 from datetime import datetime, timezone, timedelta
 from app.models import (
@@ -21,7 +21,7 @@ TODAY_END = NOW.replace(hour=18, minute=0, second=0, microsecond=0)
 
 
 def _uid(prefix: str) -> str:
-    return f"{prefix}-{uuid.uuid4().hex[:8]}"
+    return f"{prefix}-{secrets.token_hex(4)}"
 
 
 def seed_demo() -> dict:
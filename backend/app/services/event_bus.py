@@ -0,0 +1,102 @@
+"""In-process fan-out of shift events to Kafka, Snowflake and WebSocket clients.
+
+``publish`` only enqueues, so request handlers never wait on a sink. Kafka
+and WebSocket delivery each have a long-lived consumer task that drains its
+queue in batches; Snowflake rows go straight onto the batched
+``snowflake_writer`` queue, which already has its own consumer.
+"""
+import asyncio
+import logging
+from typing import List
+
+from app.models import ShiftEvent
+from app.services.kafka_service import get_kafka_service
+from app.services.snowflake_writer import snowflake_writer
+from app.websocket.manager import websocket_manager
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 500
+MAX_QUEUE_SIZE = 100_000
+KAFKA_POLL_INTERVAL = 0.5  # seconds
+
+
+class EventBus:
+    """Queues shift events and delivers them from persistent consumer tasks."""
+    
+    def __init__(self):
+        """Initialize the per-sink queues."""
+        self.kafka_queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
+        self.ws_queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
+        self._tasks: List[asyncio.Task] = []
+    
+    def start(self):
+        """Start the consumer tasks (call from the FastAPI startup hook)."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._consume(self.kafka_queue, self._produce_kafka), name="event-bus-kafka"),
+            asyncio.create_task(self._consume(self.ws_queue, self._broadcast_ws), name="event-bus-ws"),
+            asyncio.create_task(self._poll_kafka(), name="event-bus-kafka-poll"),
+        ]
+    
+    def publish(self, event: ShiftEvent):
+        """Hand an event to every sink without awaiting any of them."""
+        snowflake_writer.put_nowait("shift_events", event)
+        for queue in (self.kafka_queue, self.ws_queue):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("Event bus queue full, dropping %s for shift %s", event.event_type, event.shift_id)
+    
+    async def stop(self):
+        """Stop the consumers, deliver whatever is still queued and flush Kafka."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
+        for queue, deliver in ((self.kafka_queue, self._produce_kafka), (self.ws_queue, self._broadcast_ws)):
+            batch = []
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch:
+                await deliver(batch)
+        await asyncio.to_thread(get_kafka_service().flush)
+    
+    async def _consume(self, queue: asyncio.Queue, deliver):
+        """Deliver everything queued so far, up to ``MAX_BATCH`` events at a time."""
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty() and len(batch) < MAX_BATCH:
+                batch.append(queue.get_nowait())
+            await deliver(batch)
+    
+    async def _poll_kafka(self):
+        """Tick the producer so delivery callbacks run even while no events arrive."""
+        kafka_service = get_kafka_service()
+        while True:
+            await asyncio.sleep(KAFKA_POLL_INTERVAL)
+            try:
+                kafka_service.poll(0)  # non-blocking
+            except Exception as e:
+                logger.error("Error polling Kafka producer: %s", e)
+    
+    async def _produce_kafka(self, batch: List[ShiftEvent]):
+        """Produce a batch off the event loop; failures are logged, never raised."""
+        try:
+            await asyncio.to_thread(get_kafka_service().produce_shift_events, batch)
+        except Exception as e:
+            logger.error("Error producing %d events to Kafka: %s", len(batch), e, exc_info=True)
+    
+    async def _broadcast_ws(self, batch: List[ShiftEvent]):
+        """Queue each event on the WebSocket outboxes (one JSON object per frame)."""
+        for event in batch:
+            try:
+                await websocket_manager.broadcast_event(event)
+            except Exception as e:
+                logger.error("Error broadcasting WebSocket event: %s", e)
+
+
+# Global event bus instance
+event_bus = EventBus()
@@ -1,8 +1,10 @@
 """Kafka producer service for shift events."""
-import json
 import logging
+from functools import lru_cache
+from typing import List
 from datetime import datetime
-from typing import Optional
+
+import orjson
 
 try:
     from confluent_kafka import Producer
@@ -35,29 +37,39 @@ class KafkaService:
             'sasl.password': settings.kafka_password,
             'acks': 'all',  # Wait for all replicas
             'retries': 3,
+            # Let librdkafka accumulate and compress batches instead of sending per event
+            'linger.ms': 20,
+            'batch.size': 65536,
+            'batch.num.messages': 10000,
+            'queue.buffering.max.messages': 1_000_000,
+            'compression.type': 'zstd',
         })
         self.topic = settings.kafka_topic
-        self._ensure_topic_exists()
+        self._admin = None
     
-    def _ensure_topic_exists(self):
-        """Ensure the Kafka topic exists (create if it doesn't)."""
-        if not KAFKA_AVAILABLE:
-            return
+    def ensure_topic_exists(self):
+        """
+        Ensure the Kafka topic exists (create if it doesn't).
+        
+        Blocks on a metadata round trip, so it is run once from the startup hook
+        in a worker thread rather than from ``__init__``.
+        """
         try:
-            admin_client = AdminClient({
-                'bootstrap.servers': settings.kafka_bootstrap_servers,
-                'security.protocol': 'SASL_SSL',
-                'sasl.mechanisms': 'PLAIN',
-                'sasl.username': settings.kafka_username,
-                'sasl.password': settings.kafka_password,
-            })
+            if self._admin is None:
+                self._admin = AdminClient({
+                    'bootstrap.servers': settings.kafka_bootstrap_servers,
+                    'security.protocol': 'SASL_SSL',
+                    'sasl.mechanisms': 'PLAIN',
+                    'sasl.username': settings.kafka_username,
+                    'sasl.password': settings.kafka_password,
+                })
             
             # Check if topic exists
-            metadata = admin_client.list_topics(timeout=10)
+            metadata = self._admin.list_topics(timeout=10)
             if self.topic not in metadata.topics:
                 # Create topic
                 topic = NewTopic(self.topic, num_partitions=3, replication_factor=3)
-                admin_client.create_topics([topic])
+                self._admin.create_topics([topic])
                 logger.info(f"Created Kafka topic: {self.topic}")
         except Exception as e:
             logger.warning(f"Could not ensure topic exists (may already exist): {e}")
@@ -73,61 +85,94 @@ class KafkaService:
             True if successful, False otherwise
         """
         try:
-            # Serialize event to JSON
-            event_dict = {
-                "event_id": event.event_id,
-                "shift_id": event.shift_id,
-                "employee_id": event.employee_id,
-                "event_type": event.event_type.value,
-                "event_time": event.event_time.isoformat(),
-                "payload": event.payload or {},
-            }
-            
-            message = json.dumps(event_dict).encode('utf-8')
-            
             # Produce message
             self.producer.produce(
                 self.topic,
-                value=message,
+                value=self._serialize(event),
                 callback=self._delivery_callback
             )
             
-            # Flush to ensure message is sent
-            self.producer.flush(timeout=5)
+            # Serve delivery callbacks without waiting; flush() happens on shutdown
+            self.producer.poll(0)
             
-            logger.info(f"Produced shift event to Kafka: {event.event_type} for shift {event.shift_id}")
+            logger.debug("Produced shift event to Kafka: %s for shift %s", event.event_type, event.shift_id)
             return True
             
         except Exception as e:
             logger.error(f"Error producing to Kafka: {e}")
             return False
     
+    def produce_shift_events(self, events: List[ShiftEvent]) -> int:
+        """
+        Produce a batch of shift events without waiting for delivery.
+        
+        Messages are handed to librdkafka's internal queue and delivery
+        callbacks are served with a non-blocking poll; call ``flush`` on
+        shutdown to wait for outstanding deliveries.
+        
+        Args:
+            events: ShiftEvents to send
+            
+        Returns:
+            Number of events handed to the producer
+        """
+        produced = 0
+        for event in events:
+            try:
+                try:
+                    self.producer.produce(self.topic, value=self._serialize(event), callback=self._delivery_callback)
+                except BufferError:
+                    # Local queue full: serve deliveries to make room, then retry once
+                    self.producer.poll(1)
+                    self.producer.produce(self.topic, value=self._serialize(event), callback=self._delivery_callback)
+                produced += 1
+            except Exception as e:
+                logger.error(f"Error producing to Kafka: {e}")
+        self.producer.poll(0)
+        logger.debug("Produced %d shift events to Kafka", produced)
+        return produced
+    
+    def poll(self, timeout: float = 0) -> int:
+        """Serve pending delivery callbacks; returns the number served."""
+        return self.producer.poll(timeout)
+    
+    def flush(self, timeout: float = 10) -> int:
+        """Wait for outstanding deliveries; returns the number still queued."""
+        return self.producer.flush(timeout=timeout)
+    
+    @staticmethod
+    def _serialize(event: ShiftEvent) -> bytes:
+        """Serialize a shift event to the JSON message format."""
+        event_dict = {
+            "event_id": event.event_id,
+            "shift_id": event.shift_id,
+            "employee_id": event.employee_id,
+            "event_type": event.event_type,  # str enum; orjson writes the value
+            "event_time": event.event_time.isoformat(),
+            "payload": event.payload or {},
+        }
+        return orjson.dumps(event_dict)
+    
     def _delivery_callback(self, err, msg):
         """Callback for message delivery confirmation."""
         if err:
             logger.error(f"Message delivery failed: {err}")
         else:
-            logger.debug(f"Message delivered to {msg.topic()} [{msg.partition()}]")
-
-
-# Global instance
-kafka_service: Optional[KafkaService] = None
+            logger.debug("Message delivered to %s [%s]", msg.topic(), msg.partition())
 
 
+@lru_cache(maxsize=1)
 def get_kafka_service() -> KafkaService:
-    """Get or create Kafka service instance."""
-    global kafka_service
-    if kafka_service is None:
-        if not KAFKA_AVAILABLE:
-            logger.info("confluent-kafka not available, using mock Kafka service")
-            return MockKafkaService()
-        try:
-            kafka_service = KafkaService()
-        except Exception as e:
-            logger.warning(f"Failed to initialize Kafka service: {e}, using mock service")
-            # Return a mock service that does nothing
-            return MockKafkaService()
-    return kafka_service
+    """Get or create the Kafka service singleton (mock included, resolved once)."""
+    if not KAFKA_AVAILABLE:
+        logger.info("confluent-kafka not available, using mock Kafka service")
+        return MockKafkaService()
+    try:
+        return KafkaService()
+    except Exception as e:
+        logger.warning(f"Failed to initialize Kafka service: {e}, using mock service")
+        # Return a mock service that does nothing
+        return MockKafkaService()
 
 
 class MockKafkaService:
@@ -135,6 +180,22 @@ class MockKafkaService:
     
     def produce_shift_event(self, event: ShiftEvent) -> bool:
         """Mock produce that just logs."""
-        logger.info(f"[MOCK] Would produce event to Kafka: {event.event_type}")
+        logger.debug("[MOCK] Would produce event to Kafka: %s", event.event_type)
         return True
+    
+    def produce_shift_events(self, events: List[ShiftEvent]) -> int:
+        """Mock batch produce that just logs."""
+        logger.debug("[MOCK] Would produce %d events to Kafka", len(events))
+        return len(events)
+    
+    def ensure_topic_exists(self):
+        """Mock topic check (nothing to create)."""
+    
+    def poll(self, timeout: float = 0) -> int:
+        """Mock poll (no deliveries to serve)."""
+        return 0
+    
+    def flush(self, timeout: float = 10) -> int:
+        """Mock flush (nothing is ever queued)."""
+        return 0
 
@@ -1,16 +1,51 @@
 """Service for calculating unit readiness and detecting understaffing."""
 import logging
-from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Tuple
 from app.models import (
-    Personnel, Unit, UnitAssignment, AssignmentStatus, AvailabilityStatus
+    Personnel, Unit, UnitAssignment, AssignmentStatus, AvailabilityStatus,
+    parse_expiration,
 )
 from app.stores import (
-    personnel_store, units_store, unit_assignments_store
+    personnel_store, units_store, unit_assignments_store, cert_expiry_index
 )
 
 logger = logging.getLogger(__name__)
 
+_TICK = timedelta(microseconds=1)
+
+# unit_id -> (computed_at, valid_until, result); valid only for the store versions below
+_readiness_cache: Dict[str, Tuple[datetime, datetime, Dict]] = {}
+_readiness_cache_versions: Tuple[int, int, int] = (-1, -1, -1)
+
+
+def _valid_until(
+    now: datetime,
+    assignments: List[UnitAssignment],
+    assigned_personnel: List[Personnel],
+) -> datetime:
+    """
+    Earliest instant after ``now`` at which a unit's readiness can change without a store write.
+    
+    That is the next shift start or end among the unit's ON_SHIFT assignments,
+    the next certification expiry among its assigned personnel, or midnight UTC
+    (when "scheduled for today" rolls over).
+    """
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    until = today_start + timedelta(days=1)
+    for a in assignments:
+        # included from shift_start on, excluded once past shift_end
+        for boundary in (a.shift_start, a.shift_end + _TICK):
+            if now < boundary < until:
+                until = boundary
+    for person in assigned_personnel:
+        for exp_date in person.cert_expirations.values():
+            exp_date = parse_expiration(exp_date)
+            # counts as expired once now is past the expiration
+            if exp_date is not None and now < exp_date + _TICK < until:
+                until = exp_date + _TICK
+    return until
+
 
 class ReadinessService:
     """Service for calculating unit readiness scores and detecting issues."""
@@ -19,11 +54,15 @@ class ReadinessService:
     def calculate_readiness_score(
         unit: Unit,
         assigned_personnel: List[Personnel],
-        assignments: List[UnitAssignment]
+        assignments: List[UnitAssignment],
+        now: Optional[datetime] = None,
     ) -> Dict:
         """
         Calculate readiness score for a unit (0-100).
         
+        Certifications expiring before ``now`` (default: the current time) count
+        as expired.
+        
         Returns dict with:
         - readiness_score: int (0-100)
         - staff_required: int
@@ -33,29 +72,40 @@ class ReadinessService:
         - issues: List[str]
         """
         staff_required = unit.minimum_staff
-        staff_present = len([a for a in assignments if a.assignment_status == AssignmentStatus.ON_SHIFT])
+        if not assignments and not assigned_personnel:
+            # Nobody on shift: score is 0 (minimum_staff > 0) and every requirement is missing
+            certifications_missing = list(unit.required_certifications)
+            issues = [f"Understaffed: 0/{staff_required}"]
+            if certifications_missing:
+                issues.append(f"Missing certifications: {', '.join(certifications_missing)}")
+            return {
+                "readiness_score": 0,
+                "staff_required": staff_required,
+                "staff_present": 0,
+                "certifications_missing": certifications_missing,
+                "expired_certifications": [],
+                "is_understaffed": True,
+                "issues": issues,
+            }
+        
+        staff_present = sum(1 for a in assignments if a.assignment_status == AssignmentStatus.ON_SHIFT)
         
         # Check for missing certifications
-        certifications_missing = []
-        for req_cert in unit.required_certifications:
-            has_cert = any(
-                req_cert in person.certifications 
-                for person in assigned_personnel
-            )
-            if not has_cert:
-                certifications_missing.append(req_cert)
+        held = frozenset().union(*(person.cert_set for person in assigned_personnel))
+        certifications_missing = [
+            req_cert for req_cert in unit.required_certifications if req_cert not in held
+        ]
         
         # Check for expired certifications
         expired_certs = []
-        for person in assigned_personnel:
-            for cert_name, exp_date in person.cert_expirations.items():
-                if isinstance(exp_date, str):
-                    try:
-                        exp_date = datetime.fromisoformat(exp_date.replace('Z', '+00:00'))
-                    except:
-                        continue
-                if isinstance(exp_date, datetime) and exp_date < datetime.now(timezone.utc):
-                    expired_certs.append(f"{person.name}: {cert_name}")
+        now = now or datetime.now(timezone.utc)
+        # The expiry index orders every tracked expiration; if none has passed, skip the scan
+        if cert_expiry_index.any_before(now):
+            for person in assigned_personnel:
+                for cert_name, exp_date in person.cert_expirations.items():
+                    exp_date = parse_expiration(exp_date)
+                    if exp_date is not None and exp_date < now:
+                        expired_certs.append(f"{person.name}: {cert_name}")
         
         # Calculate base score (staffing)
         if staff_required == 0:
@@ -96,23 +146,40 @@ class ReadinessService:
         }
     
     @staticmethod
-    def get_unit_readiness(unit_id: str) -> Optional[Dict]:
-        """Get current readiness status for a unit."""
+    def get_unit_readiness(unit_id: str, now: Optional[datetime] = None) -> Optional[Dict]:
+        """
+        Get current readiness status for a unit.
+        
+        Results are cached until the unit, personnel or assignment store changes
+        or a shift boundary / certification expiry makes them stale.
+        """
         unit = units_store.get(unit_id)
         if not unit:
             return None
+        return ReadinessService._readiness_for(unit, now or datetime.now(timezone.utc))
+    
+    @staticmethod
+    def _readiness_for(unit: Unit, now: datetime) -> Dict:
+        """Readiness for a unit already fetched from ``units_store`` (cached as described above)."""
+        global _readiness_cache_versions
+        unit_id = unit.unit_id
+        versions = (units_store.version, personnel_store.version, unit_assignments_store.version)
+        if versions != _readiness_cache_versions:
+            _readiness_cache.clear()
+            _readiness_cache_versions = versions
+        cached = _readiness_cache.get(unit_id)
+        if cached and cached[0] <= now < cached[1]:
+            return {**cached[2], "timestamp": now.isoformat()}
         
         # Get active assignments for this unit
         # Include assignments that are currently active OR scheduled for today
-        now = datetime.now(timezone.utc)
+        on_shift = unit_assignments_store.lookup("on_shift_by_unit", unit_id)
         today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
         today_end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
         
         active_assignments = [
-            a for a in unit_assignments_store.values()
-            if a.unit_id == unit_id
-            and a.assignment_status == AssignmentStatus.ON_SHIFT
-            and (
+            a for a in on_shift
+            if (
                 # Currently active
                 (a.shift_start <= now <= a.shift_end)
                 or
@@ -130,10 +197,10 @@ class ReadinessService:
         
         # Calculate readiness
         readiness = ReadinessService.calculate_readiness_score(
-            unit, assigned_personnel, active_assignments
+            unit, assigned_personnel, active_assignments, now
         )
         
-        return {
+        result = {
             "unit_id": unit_id,
             "unit_name": unit.unit_name,
             "unit_type": unit.type.value,
@@ -147,16 +214,15 @@ class ReadinessService:
                 }
                 for p in assigned_personnel
             ],
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now.isoformat(),
         }
+        _readiness_cache[unit_id] = (now, _valid_until(now, on_shift, assigned_personnel), result)
+        return {**result}
     
     @staticmethod
     def check_all_units() -> List[Dict]:
         """Check readiness for all units."""
-        results = []
-        for unit_id in units_store.keys():
-            readiness = ReadinessService.get_unit_readiness(unit_id)
-            if readiness:
-                results.append(readiness)
-        return results
+        now = datetime.now(timezone.utc)
+        readiness_for = ReadinessService._readiness_for
+        return [readiness_for(unit, now) for unit in units_store.values()]
 
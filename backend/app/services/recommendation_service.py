@@ -2,7 +2,7 @@
 import logging
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict
-from app.models import ReadinessRecommendation, AvailabilityStatus
+from app.models import ReadinessRecommendation, AvailabilityStatus, parse_expiration
 from app.stores import personnel_store, units_store, unit_assignments_store
 from app.services.readiness_service import ReadinessService
 
@@ -63,9 +63,8 @@ class RecommendationService:
             # ── Missing certifications ────────────────────────────────────────
             for cert in status["certifications_missing"]:
                 candidates = [
-                    p for p in personnel_store.values()
-                    if cert in p.certifications
-                    and p.availability_status == AvailabilityStatus.AVAILABLE
+                    p for p in personnel_store.lookup("by_status", AvailabilityStatus.AVAILABLE)
+                    if cert in p.cert_set
                 ]
                 if candidates:
                     recs.append(ReadinessRecommendation(
@@ -102,16 +101,10 @@ class RecommendationService:
                     created_at=now,
                 ))
 
-            for person in personnel_store.values():
-                if person.current_unit_id != unit_id:
-                    continue
+            for person in personnel_store.lookup("by_unit", unit_id):
                 for cert_name, exp in person.cert_expirations.items():
-                    if isinstance(exp, str):
-                        try:
-                            exp = datetime.fromisoformat(exp.replace("Z", "+00:00"))
-                        except Exception:
-                            continue
-                    if isinstance(exp, datetime) and now < exp <= soon:
+                    exp = parse_expiration(exp)
+                    if exp is not None and now < exp <= soon:
                         days_left = (exp - now).days
                         recs.append(ReadinessRecommendation(
                             recommendation_id=_rec_id(),
@@ -130,15 +123,9 @@ class RecommendationService:
         """Find available personnel who meet the unit's cert requirements but are not assigned."""
         assigned_ids = {
             a.personnel_id
-            for a in unit_assignments_store.values()
-            if a.unit_id == unit_id
+            for a in unit_assignments_store.lookup("by_unit", unit_id)
         }
-        candidates = []
-        for p in personnel_store.values():
-            if p.personnel_id in assigned_ids:
-                continue
-            if p.availability_status != AvailabilityStatus.AVAILABLE:
-                continue
-            if all(c in p.certifications for c in unit.required_certifications):
-                candidates.append(p)
-        return candidates
+        return [
+            p for p in personnel_store.lookup("by_status", AvailabilityStatus.AVAILABLE)
+            if p.personnel_id not in assigned_ids and unit.required_cert_set <= p.cert_set
+        ]
@@ -0,0 +1,102 @@
+"""Batched Snowflake writer for RAW table ingestion.
+
+API handlers enqueue records instead of issuing one Snowflake statement per
+row. A background task per table drains its queue, accumulates up to
+``BATCH_SIZE`` rows or ``FLUSH_INTERVAL`` seconds worth of records, and hands
+the batch to ``SnowflakeService.load_batch`` which stages it and loads it with
+a single COPY INTO / MERGE.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from app.services.snowflake_service import get_snowflake_service
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("personnel", "units", "unit_assignments", "shift_events")
+BATCH_SIZE = 10_000
+FLUSH_INTERVAL = 0.5  # seconds
+MAX_QUEUE_SIZE = 100_000
+
+
+class SnowflakeWriter:
+    """Queues RAW table records and loads them into Snowflake in batches."""
+    
+    def __init__(self, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        """Initialize one bounded queue per RAW table."""
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queues: Dict[str, asyncio.Queue] = {
+            table: asyncio.Queue(maxsize=MAX_QUEUE_SIZE) for table in TABLES
+        }
+        self._tasks: List[asyncio.Task] = []
+    
+    def start(self):
+        """Start one drain task per table (call from the FastAPI startup hook)."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._drain(table), name=f"snowflake-writer-{table}")
+            for table in TABLES
+        ]
+        logger.info(f"Snowflake writer started (batch_size={self.batch_size}, flush_interval={self.flush_interval}s)")
+    
+    async def put(self, table: str, record: Any):
+        """Queue a record for the given RAW table."""
+        await self.queues[table].put(record)
+    
+    def put_nowait(self, table: str, record: Any):
+        """Queue a record without waiting; drops (and logs) it if the queue is full."""
+        try:
+            self.queues[table].put_nowait(record)
+        except asyncio.QueueFull:
+            logger.warning("Snowflake %s queue full, dropping record", table)
+    
+    async def stop(self):
+        """Cancel the drain tasks and flush whatever is still queued."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
+        for table, queue in self.queues.items():
+            batch = []
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch:
+                await self._flush(table, batch)
+    
+    async def _drain(self, table: str):
+        """Accumulate up to ``batch_size`` rows or ``flush_interval`` seconds, then flush."""
+        queue = self.queues[table]
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.flush_interval
+            try:
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Shutting down mid-batch: don't drop rows already dequeued
+                await self._flush(table, batch)
+                raise
+            await self._flush(table, batch)
+    
+    async def _flush(self, table: str, batch: List[Any]):
+        """Load a batch off the event loop; failures are logged, never raised."""
+        try:
+            snowflake_service = get_snowflake_service()
+            await asyncio.to_thread(snowflake_service.load_batch, table, batch)
+        except Exception as e:
+            logger.error(f"Error flushing {len(batch)} {table} rows to Snowflake: {e}", exc_info=True)
+
+
+# Global writer instance
+snowflake_writer = SnowflakeWriter()
@@ -1,14 +1,186 @@
 """Centralized in-memory data stores."""
-from typing import Dict
+import secrets
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from typing import (
+    Any, Callable, DefaultDict, Dict, Hashable, Iterable, KeysView, List, Optional, Tuple, TypeVar,
+)
 from app.models import (
     Personnel, Unit, UnitAssignment, Certification,
     Station, ReadinessAlert, OperationalIncident,
+    AssignmentStatus, parse_expiration,
+)
+
+V = TypeVar("V")
+
+_EMPTY: Dict[str, None] = {}
+
+
+def new_id() -> str:
+    """Random 128-bit hex id for new store records (cheaper than str(uuid.uuid4()))."""
+    return secrets.token_hex(16)
+
+
+class SortedIndex:
+    """
+    Entries ``(sort_key, store_key, item)`` kept sorted for bisect range queries.
+    
+    ``entries_fn(record)`` yields ``(sort_key, item)`` pairs; a record may
+    contribute any number of entries.
+    """
+    
+    def __init__(self, entries_fn: Callable[[Any], Iterable[Tuple[Any, Any]]]):
+        self._entries_fn = entries_fn
+        self.entries: List[Tuple[Any, str, Any]] = []
+        # store key -> its entries (to remove them on rewrite/delete)
+        self._by_key: Dict[str, List[Tuple[Any, str, Any]]] = {}
+    
+    def add(self, key: str, record: Any):
+        entries = [(sort_key, key, item) for sort_key, item in self._entries_fn(record)]
+        for entry in entries:
+            insort(self.entries, entry)
+        if entries:
+            self._by_key[key] = entries
+    
+    def remove(self, key: str):
+        for entry in self._by_key.pop(key, ()):
+            del self.entries[bisect_left(self.entries, entry)]
+    
+    def clear(self):
+        self.entries.clear()
+        self._by_key.clear()
+    
+    def before(self, bound: Any) -> List[Tuple[Any, str, Any]]:
+        """Entries whose sort key is strictly less than ``bound``."""
+        return self.entries[:bisect_left(self.entries, (bound,))]
+    
+    def any_before(self, bound: Any) -> bool:
+        """Whether any entry's sort key is strictly less than ``bound`` (O(1))."""
+        return bool(self.entries) and self.entries[0][0] < bound
+    
+    def through(self, bound: Any) -> List[Tuple[Any, str, Any]]:
+        """Entries whose sort key is less than or equal to ``bound``."""
+        # (bound, <highest str>) sorts after every (bound, store_key, ...) entry
+        return self.entries[:bisect_right(self.entries, (bound, "\U0010ffff"))]
+
+
+class IndexedStore(Dict[str, V]):
+    """
+    Dict-backed store that maintains secondary indexes on write.
+    
+    Each index maps a derived value (``key_fn(record)``) to the store keys
+    holding it, kept in insertion order; ``key_fn`` returning ``None`` leaves
+    the record out of that index. ``sorted_indexes`` are ``SortedIndex``
+    range indexes maintained alongside. Records mutated in place must be
+    written back (``store[key] = record``) to be re-indexed. ``version``
+    increases on every write, so derived results can be cached against it.
+    """
+    
+    def __init__(
+        self,
+        sorted_indexes: Optional[Dict[str, SortedIndex]] = None,
+        **indexes: Callable[[Any], Optional[Hashable]],
+    ):
+        super().__init__()
+        self.version = 0
+        self.sorted_indexes: Dict[str, SortedIndex] = sorted_indexes or {}
+        self._index_fns = indexes
+        self.indexes: Dict[str, DefaultDict[Hashable, Dict[str, None]]] = {
+            name: defaultdict(dict) for name in indexes
+        }
+        # store key -> indexed value, per index (to unindex stale values)
+        self._indexed_values: Dict[str, Dict[str, Hashable]] = {name: {} for name in indexes}
+    
+    def __setitem__(self, key: str, value: V):
+        self.version += 1
+        self._unindex(key)
+        super().__setitem__(key, value)
+        for name, key_fn in self._index_fns.items():
+            indexed = key_fn(value)
+            if indexed is not None:
+                self.indexes[name][indexed][key] = None
+                self._indexed_values[name][key] = indexed
+        for sorted_index in self.sorted_indexes.values():
+            sorted_index.add(key, value)
+    
+    def __delitem__(self, key: str):
+        super().__delitem__(key)
+        self.version += 1
+        self._unindex(key)
+    
+    def pop(self, key: str, *default):
+        if key in self:
+            self.version += 1
+            self._unindex(key)
+        return super().pop(key, *default)
+    
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+    
+    def clear(self):
+        super().clear()
+        self.version += 1
+        for name in self._index_fns:
+            self.indexes[name].clear()
+            self._indexed_values[name].clear()
+        for sorted_index in self.sorted_indexes.values():
+            sorted_index.clear()
+    
+    def ids_for(self, index: str, value: Hashable) -> KeysView[str]:
+        """Store keys whose ``index`` value equals ``value``."""
+        return self.indexes[index].get(value, _EMPTY).keys()
+    
+    def lookup(self, index: str, value: Hashable) -> List[V]:
+        """Records whose ``index`` value equals ``value``."""
+        return [self[key] for key in self.ids_for(index, value)]
+    
+    def count_by(self, predicate: Callable[[V], bool]) -> int:
+        """Number of records matching ``predicate``, without building a list."""
+        return sum(1 for record in self.values() if predicate(record))
+    
+    def _unindex(self, key: str):
+        for sorted_index in self.sorted_indexes.values():
+            sorted_index.remove(key)
+        for name, values in self._indexed_values.items():
+            indexed = values.pop(key, None)
+            if indexed is None:
+                continue
+            keys = self.indexes[name][indexed]
+            keys.pop(key, None)
+            if not keys:
+                del self.indexes[name][indexed]
+
+
+def _cert_expiry_entries(person: Personnel) -> Iterable[Tuple[Any, str]]:
+    """(expiration, cert_name) for each parseable certification expiration."""
+    for cert_name, exp_date in person.cert_expirations.items():
+        exp_date = parse_expiration(exp_date)
+        if exp_date is not None:
+            yield exp_date, cert_name
+
+
+personnel_store: IndexedStore[Personnel] = IndexedStore(
+    sorted_indexes={"cert_expiry": SortedIndex(_cert_expiry_entries)},
+    by_status=lambda p: p.availability_status,
+    by_unit=lambda p: p.current_unit_id,
+)
+units_store: IndexedStore[Unit] = IndexedStore(
+    by_type=lambda u: u.type,
+)
+unit_assignments_store: IndexedStore[UnitAssignment] = IndexedStore(
+    by_unit=lambda a: a.unit_id,
+    by_personnel=lambda a: a.personnel_id,
+    on_shift_by_unit=lambda a: a.unit_id if a.assignment_status == AssignmentStatus.ON_SHIFT else None,
+)
+certifications_store: IndexedStore[Certification] = IndexedStore(
+    by_category=lambda c: c.category,
 )
+stations_store: IndexedStore[Station] = IndexedStore()
+alerts_store: IndexedStore[ReadinessAlert] = IndexedStore()
+incidents_store: IndexedStore[OperationalIncident] = IndexedStore()
 
-personnel_store: Dict[str, Personnel] = {}
-units_store: Dict[str, Unit] = {}
-unit_assignments_store: Dict[str, UnitAssignment] = {}
-certifications_store: Dict[str, Certification] = {}
-stations_store: Dict[str, Station] = {}
-alerts_store: Dict[str, ReadinessAlert] = {}
-incidents_store: Dict[str, OperationalIncident] = {}
+# unit_id -> ids of ON_SHIFT assignments (kept current by unit_assignments_store)
+on_shift_by_unit = unit_assignments_store.indexes["on_shift_by_unit"]
+# (expiration, personnel_id, cert_name), ordered by expiration
+cert_expiry_index = personnel_store.sorted_indexes["cert_expiry"]
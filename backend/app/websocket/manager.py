@@ -1,35 +1,52 @@
 """WebSocket manager for real-time shift event broadcasting."""
-import json
+import asyncio
 import logging
-from typing import Set
+from typing import Dict
+import orjson
 from fastapi import WebSocket
 from app.models import ShiftEvent
+from app.websocket.outbox import ConnectionOutbox
 
 logger = logging.getLogger(__name__)
 
+# Constant envelope around each encoded event: {"type":"shift_event","data":<event>}
+_SHIFT_EVENT_PREFIX = b'{"type":"shift_event","data":'
+_SHIFT_EVENT_SUFFIX = b"}"
+
 
 class WebSocketManager:
     """Manages WebSocket connections and broadcasts events."""
     
     def __init__(self):
         """Initialize WebSocket manager."""
-        self.active_connections: Set[WebSocket] = set()
+        # Map of WebSocket -> outbound queue with its writer task
+        self.active_connections: Dict[WebSocket, ConnectionOutbox] = {}
     
     async def connect(self, websocket: WebSocket):
         """Accept a new WebSocket connection."""
         await websocket.accept()
-        self.active_connections.add(websocket)
+        self.active_connections[websocket] = ConnectionOutbox(websocket, self.disconnect)
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
     
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
-        self.active_connections.discard(websocket)
+        outbox = self.active_connections.pop(websocket, None)
+        if outbox is None:
+            return
+        outbox.close()
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
     
+    async def flush(self):
+        """Wait for every queued message to be written (used on shutdown)."""
+        await asyncio.gather(*(outbox.flush() for outbox in list(self.active_connections.values())))
+    
     async def broadcast_event(self, event: ShiftEvent):
         """
         Broadcast a shift event to all connected clients.
         
+        The event is serialized once and queued on each connection's outbox;
+        the per-connection writers do the actual sends.
+        
         Args:
             event: ShiftEvent to broadcast
         """
@@ -37,34 +54,23 @@ class WebSocketManager:
             return
         
         # Serialize event
-        message = {
-            "type": "shift_event",
-            "data": {
-                "event_id": event.event_id,
-                "shift_id": event.shift_id,
-                "employee_id": event.employee_id,
-                "event_type": event.event_type.value,
-                "event_time": event.event_time.isoformat(),
-                "payload": event.payload or {},
-            }
+        data = {
+            "event_id": event.event_id,
+            "shift_id": event.shift_id,
+            "employee_id": event.employee_id,
+            "event_type": event.event_type,  # str enum; orjson writes the value
+            "event_time": event.event_time.isoformat(),
+            "payload": event.payload or {},
         }
         
-        message_json = json.dumps(message)
-        
-        # Broadcast to all connections
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message_json)
-            except Exception as e:
-                logger.error(f"Error sending to WebSocket: {e}")
-                disconnected.add(connection)
+        # Encoded once (only the event itself) and shared by every connection's outbox
+        message_json = (_SHIFT_EVENT_PREFIX + orjson.dumps(data) + _SHIFT_EVENT_SUFFIX).decode()
         
-        # Remove disconnected connections
-        for connection in disconnected:
-            self.disconnect(connection)
+        # Queue for every connection; failed sockets are removed by their writer
+        for outbox in self.active_connections.values():
+            outbox.put(message_json)
         
-        logger.debug(f"Broadcasted event to {len(self.active_connections)} clients")
+        logger.debug("Queued event for %d clients", len(self.active_connections))
 
 
 # Global WebSocket manager instance
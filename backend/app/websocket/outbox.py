@@ -0,0 +1,77 @@
+"""Per-connection outbound message queue for WebSocket broadcasts."""
+import asyncio
+import logging
+from typing import Callable
+from fastapi import WebSocket, WebSocketDisconnect
+from websockets.exceptions import ConnectionClosed
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of queued frames a writer sends back-to-back before yielding
+MAX_BATCH = 50
+# Seconds a single send may take before the connection is treated as dead
+SEND_TIMEOUT = 5.0
+# Raised when the client has already gone away; routine, so not logged as errors
+_CLOSED_ERRORS = (WebSocketDisconnect, ConnectionClosed, RuntimeError)
+
+
+class ConnectionOutbox:
+    """
+    Queue plus a single long-lived writer task for one WebSocket.
+    
+    Broadcasters call ``put`` (no await, no Task per message); the writer
+    drains up to ``MAX_BATCH`` queued frames at a time and sends them in order.
+    A slow client only delays its own outbox, and a send stuck for longer than
+    ``SEND_TIMEOUT`` drops the connection.
+    """
+    
+    def __init__(self, websocket: WebSocket, on_error: Callable[[WebSocket], None]):
+        """Create the queue and start the writer task for ``websocket``."""
+        self.websocket = websocket
+        self._on_error = on_error
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+    
+    def put(self, message: str):
+        """Queue a serialized message for this connection."""
+        self._queue.put_nowait(message)
+    
+    async def flush(self):
+        """Wait until every queued message has been sent (or dropped on error)."""
+        await self._queue.join()
+    
+    def close(self):
+        """Stop the writer task."""
+        self._task.cancel()
+    
+    async def _run(self):
+        """Drain the queue in batches until the connection fails or is closed."""
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty() and len(batch) < MAX_BATCH:
+                batch.append(self._queue.get_nowait())
+            try:
+                for message in batch:
+                    # The ASGI message send_text would build; framing is left to the server
+                    await asyncio.wait_for(
+                        self.websocket.send({"type": "websocket.send", "text": message}),
+                        SEND_TIMEOUT,
+                    )
+            except Exception as e:
+                if isinstance(e, _CLOSED_ERRORS):
+                    logger.debug("WebSocket closed while sending: %r", e)
+                else:
+                    logger.error("Error sending to WebSocket: %r", e)
+                self._discard_pending(len(batch))
+                self._on_error(self.websocket)
+                return
+            for _ in batch:
+                self._queue.task_done()
+    
+    def _discard_pending(self, in_flight: int):
+        """Mark in-flight and queued messages done so ``flush`` never hangs on a dead socket."""
+        for _ in range(in_flight):
+            self._queue.task_done()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self._queue.task_done()
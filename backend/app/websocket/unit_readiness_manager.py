@@ -1,97 +1,175 @@
 """WebSocket manager for unit readiness real-time updates."""
-import json
+import asyncio
 import logging
-from typing import Set, Dict
+import time
+from typing import Set, Dict, Optional, Tuple
+import orjson
 from fastapi import WebSocket
 from app.services.readiness_service import ReadinessService
+from app.websocket.outbox import ConnectionOutbox
 
 logger = logging.getLogger(__name__)
 
+# Seconds between flushes of coalesced readiness updates
+FLUSH_TICK = 0.05
+# Seconds an encoded readiness frame is reused (initial sends and broadcasts)
+PAYLOAD_TTL = 0.1
+
+# Constant envelope around each encoded readiness: {"type":"unit_readiness","data":<readiness>}
+_READINESS_PREFIX = b'{"type":"unit_readiness","data":'
+_READINESS_SUFFIX = b"}"
+
 
 class UnitReadinessManager:
     """Manages WebSocket connections for unit readiness broadcasts."""
     
     def __init__(self):
         """Initialize unit readiness WebSocket manager."""
-        # Map of unit_id -> set of WebSocket connections
-        self.unit_connections: Dict[str, Set[WebSocket]] = {}
+        # Map of unit_id -> {WebSocket: outbox}; broadcasts walk the dict's dense,
+        # insertion-ordered entries instead of a sparse set plus an outbox lookup
+        self.unit_connections: Dict[str, Dict[WebSocket, ConnectionOutbox]] = {}
         # Map of WebSocket -> unit_id (for cleanup)
         self.connection_units: Dict[WebSocket, str] = {}
+        # Map of WebSocket -> outbound queue with its writer task
+        self.outboxes: Dict[WebSocket, ConnectionOutbox] = {}
+        # Units with a pending readiness broadcast, deduplicated per tick
+        self._pending_units: Set[str] = set()
+        self._pending_event: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        # Map of unit_id -> (encoded_at, readiness, encoded unit_readiness frame)
+        self._payload_cache: Dict[str, Tuple[float, Dict, str]] = {}
+        # Map of unit_id -> last broadcast readiness, minus its timestamp
+        self._last_broadcast: Dict[str, Dict] = {}
     
     async def connect(self, websocket: WebSocket, unit_id: str):
         """Accept a new WebSocket connection for a specific unit."""
         await websocket.accept()
         
-        if unit_id not in self.unit_connections:
-            self.unit_connections[unit_id] = set()
-        
-        self.unit_connections[unit_id].add(websocket)
+        outbox = ConnectionOutbox(websocket, self.disconnect)
+        self.unit_connections.setdefault(unit_id, {})[websocket] = outbox
         self.connection_units[websocket] = unit_id
+        self.outboxes[websocket] = outbox
+        # The new client starts from the current state, not the last broadcast
+        self._last_broadcast.pop(unit_id, None)
         
         logger.info(f"Unit readiness WebSocket connected for unit {unit_id}. Total: {len(self.unit_connections[unit_id])}")
         
         # Send initial readiness status
-        readiness = ReadinessService.get_unit_readiness(unit_id)
-        if readiness:
-            await self.send_readiness_update(websocket, readiness)
+        payload = self._readiness_payload(unit_id)
+        if payload:
+            outbox.put(payload[2])
     
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
         unit_id = self.connection_units.get(websocket)
         if unit_id and unit_id in self.unit_connections:
-            self.unit_connections[unit_id].discard(websocket)
+            self.unit_connections[unit_id].pop(websocket, None)
             if not self.unit_connections[unit_id]:
                 del self.unit_connections[unit_id]
+                self._last_broadcast.pop(unit_id, None)
         
         self.connection_units.pop(websocket, None)
+        outbox = self.outboxes.pop(websocket, None)
+        if outbox:
+            outbox.close()
         logger.info(f"Unit readiness WebSocket disconnected for unit {unit_id}")
     
     async def send_readiness_update(self, websocket: WebSocket, readiness_data: Dict):
-        """Send readiness update to a specific WebSocket."""
+        """Queue a readiness update for a specific WebSocket."""
         message = {
             "type": "unit_readiness",
             "data": readiness_data
         }
-        try:
-            await websocket.send_text(json.dumps(message))
-        except Exception as e:
-            logger.error(f"Error sending readiness update: {e}")
+        outbox = self.outboxes.get(websocket)
+        if outbox:
+            outbox.put(orjson.dumps(message).decode())
     
-    async def broadcast_unit_readiness(self, unit_id: str):
+    def _readiness_payload(self, unit_id: str) -> Optional[Tuple[float, Dict, str]]:
+        """(encoded_at, readiness, encoded frame) for a unit, reused for ``PAYLOAD_TTL`` seconds."""
+        now = time.monotonic()
+        cached = self._payload_cache.get(unit_id)
+        if cached and now - cached[0] < PAYLOAD_TTL:
+            return cached
+        
+        readiness = ReadinessService.get_unit_readiness(unit_id)
+        if not readiness:
+            self._payload_cache.pop(unit_id, None)
+            return None
+        
+        message_json = (_READINESS_PREFIX + orjson.dumps(readiness) + _READINESS_SUFFIX).decode()
+        payload = (now, readiness, message_json)
+        self._payload_cache[unit_id] = payload
+        return payload
+    
+    def enqueue(self, unit_id: str):
         """
-        Broadcast readiness update to all connections for a unit.
+        Schedule a readiness broadcast for a unit.
+        
+        Repeated calls for the same unit within one tick collapse into a single
+        broadcast, and no Task is created per call.
         
         Args:
             unit_id: Unit ID to broadcast for
         """
+        # The unit changed: the next frame must be re-read
+        self._payload_cache.pop(unit_id, None)
         if unit_id not in self.unit_connections:
             return
+        self._pending_units.add(unit_id)
+        if self._flusher is None or self._flusher.done():
+            self._pending_event = asyncio.Event()
+            self._flusher = asyncio.create_task(self._flush_pending())
+        self._pending_event.set()
+    
+    async def _flush_pending(self):
+        """Broadcast every pending unit once per tick."""
+        while True:
+            await self._pending_event.wait()
+            await asyncio.sleep(FLUSH_TICK)
+            self._pending_event.clear()
+            pending, self._pending_units = self._pending_units, set()
+            for unit_id in pending:
+                await self.broadcast_unit_readiness(unit_id)
+    
+    async def broadcast_unit_readiness(self, unit_id: str):
+        """
+        Broadcast readiness update to all connections for a unit.
         
-        readiness = ReadinessService.get_unit_readiness(unit_id)
-        if not readiness:
+        Args:
+            unit_id: Unit ID to broadcast for
+        """
+        connections = self.unit_connections.get(unit_id)
+        if not connections:
             return
         
-        message = {
-            "type": "unit_readiness",
-            "data": readiness
-        }
-        message_json = json.dumps(message)
+        payload = self._readiness_payload(unit_id)
+        if not payload:
+            return
+        _, readiness, message_json = payload
         
-        disconnected = set()
-        for connection in self.unit_connections[unit_id]:
-            try:
-                await connection.send_text(message_json)
-            except Exception as e:
-                logger.error(f"Error broadcasting to WebSocket: {e}")
-                disconnected.add(connection)
+        # Unchanged since the last broadcast (only the timestamp moved): every
+        # subscriber already has this state
+        state = {**readiness, "timestamp": None}
+        if self._last_broadcast.get(unit_id) == state:
+            return
+        self._last_broadcast[unit_id] = state
         
-        # Remove disconnected connections
-        for connection in disconnected:
-            self.disconnect(connection)
+        # Queue for every connection; failed sockets are removed by their writer
+        for outbox in connections.values():
+            outbox.put(message_json)
         
-        logger.debug(f"Broadcasted readiness update for unit {unit_id} to {len(self.unit_connections.get(unit_id, []))} clients")
+        logger.debug("Queued readiness update for unit %s to %d clients", unit_id, len(connections))
+    
+    async def flush(self):
+        """Send pending broadcasts and wait for queued messages (used on shutdown)."""
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        pending, self._pending_units = self._pending_units, set()
+        for unit_id in pending:
+            await self.broadcast_unit_readiness(unit_id)
+        await asyncio.gather(*(outbox.flush() for outbox in list(self.outboxes.values())))
 
 
 # Global unit readiness manager instance
 unit_readiness_manager = UnitReadinessManager()
-
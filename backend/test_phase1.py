@@ -4,6 +4,8 @@ import json
 from datetime import datetime, timedelta
 
 BASE_URL = "http://localhost:8000/api"
+# One keep-alive session so the calls below reuse a connection
+session = requests.Session()
 
 def test_phase1():
     print("🧪 Testing Phase 1 - Emergency Services Data Models\n")
@@ -22,7 +24,7 @@ def test_phase1():
         "availability_status": "AVAILABLE",
         "station_id": "station-1"
     }
-    response = requests.post(f"{BASE_URL}/personnel", json=personnel_data)
+    response = session.post(f"{BASE_URL}/personnel", json=personnel_data)
     if response.status_code == 200:
         personnel = response.json()
         personnel_id = personnel["personnel_id"]
@@ -40,7 +42,7 @@ def test_phase1():
         "required_certifications": ["Firefighter II"],
         "station_id": "station-1"
     }
-    response = requests.post(f"{BASE_URL}/units", json=unit_data)
+    response = session.post(f"{BASE_URL}/units", json=unit_data)
     if response.status_code == 200:
         unit = response.json()
         unit_id = unit["unit_id"]
@@ -60,7 +62,7 @@ def test_phase1():
         "shift_end": shift_end.isoformat(),
         "assignment_status": "ON_SHIFT"
     }
-    response = requests.post(f"{BASE_URL}/unit-assignments", json=assignment_data)
+    response = session.post(f"{BASE_URL}/unit-assignments", json=assignment_data)
     if response.status_code == 200:
         assignment = response.json()
         print(f"   ✅ Created assignment (ID: {assignment['assignment_id']})")
@@ -70,7 +72,7 @@ def test_phase1():
     
     # Test 4: List Personnel
     print("\n4. Listing Personnel...")
-    response = requests.get(f"{BASE_URL}/personnel")
+    response = session.get(f"{BASE_URL}/personnel")
     if response.status_code == 200:
         personnel_list = response.json()
         print(f"   ✅ Found {len(personnel_list)} personnel")
@@ -79,7 +81,7 @@ def test_phase1():
     
     # Test 5: List Units
     print("\n5. Listing Units...")
-    response = requests.get(f"{BASE_URL}/units")
+    response = session.get(f"{BASE_URL}/units")
     if response.status_code == 200:
         units_list = response.json()
         print(f"   ✅ Found {len(units_list)} units")
@@ -88,7 +90,7 @@ def test_phase1():
     
     # Test 6: List Unit Assignments
     print("\n6. Listing Unit Assignments...")
-    response = requests.get(f"{BASE_URL}/unit-assignments")
+    response = session.get(f"{BASE_URL}/unit-assignments")
     if response.status_code == 200:
         assignments_list = response.json()
         print(f"   ✅ Found {len(assignments_list)} assignments")
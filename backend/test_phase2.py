@@ -4,6 +4,8 @@ import json
 from datetime import datetime, timedelta, timezone
 
 BASE_URL = "http://localhost:8000/api"
+# One keep-alive session so the calls below reuse a connection
+session = requests.Session()
 
 def test_phase2():
     print("🧪 Testing Phase 2 - Real-time Readiness & Certification Management\n")
@@ -24,7 +26,7 @@ def test_phase2():
         "availability_status": "AVAILABLE",
         "station_id": "station-1"
     }
-    response = requests.post(f"{BASE_URL}/personnel", json=personnel_data)
+    response = session.post(f"{BASE_URL}/personnel", json=personnel_data)
     if response.status_code != 200:
         print(f"   ⚠️  Personnel creation failed: {response.text}")
         return
@@ -40,7 +42,7 @@ def test_phase2():
         "required_certifications": ["Firefighter II"],
         "station_id": "station-1"
     }
-    response = requests.post(f"{BASE_URL}/units", json=unit_data)
+    response = session.post(f"{BASE_URL}/units", json=unit_data)
     if response.status_code != 200:
         print(f"   ⚠️  Unit creation failed: {response.text}")
         return
@@ -50,7 +52,7 @@ def test_phase2():
     
     # Test 2: Get unit readiness (should show understaffed)
     print("\n2. Testing unit readiness calculation...")
-    response = requests.get(f"{BASE_URL}/readiness/units/{unit_id}")
+    response = session.get(f"{BASE_URL}/readiness/units/{unit_id}")
     if response.status_code == 200:
         readiness = response.json()
         print(f"   ✅ Readiness Score: {readiness['readiness_score']}%")
@@ -63,7 +65,7 @@ def test_phase2():
     
     # Test 3: Check expired certifications
     print("\n3. Testing expired certification detection...")
-    response = requests.get(f"{BASE_URL}/certifications/expired")
+    response = session.get(f"{BASE_URL}/certifications/expired")
     if response.status_code == 200:
         expired = response.json()
         print(f"   ✅ Found {len(expired)} expired certifications")
@@ -74,7 +76,7 @@ def test_phase2():
     
     # Test 4: Check expiring certifications
     print("\n4. Testing expiring certification detection...")
-    response = requests.get(f"{BASE_URL}/certifications/expiring?days_ahead=30")
+    response = session.get(f"{BASE_URL}/certifications/expiring?days_ahead=30")
     if response.status_code == 200:
         expiring = response.json()
         print(f"   ✅ Found {len(expiring)} certifications expiring within 30 days")
@@ -86,7 +88,7 @@ def test_phase2():
     
     # Test 5: Mark expired certifications
     print("\n5. Testing certification expiration check...")
-    response = requests.post(f"{BASE_URL}/certifications/check-expirations")
+    response = session.post(f"{BASE_URL}/certifications/check-expirations")
     if response.status_code == 200:
         result = response.json()
         print(f"   ✅ Marked {result['marked_unqualified']} personnel as unqualified")
@@ -96,7 +98,7 @@ def test_phase2():
     
     # Test 6: Get all units readiness
     print("\n6. Testing all units readiness...")
-    response = requests.get(f"{BASE_URL}/readiness/units")
+    response = session.get(f"{BASE_URL}/readiness/units")
     if response.status_code == 200:
         all_readiness = response.json()
         print(f"   ✅ Retrieved readiness for {len(all_readiness)} units")
@@ -13,6 +13,8 @@ from datetime import datetime, timedelta, timezone
 import sys
 
 BASE_URL = "http://localhost:8000"
+# One keep-alive session so the calls below reuse a connection
+session = requests.Session()
 
 def print_section(title):
     print(f"\n{'='*60}")
@@ -37,7 +39,7 @@ def test_personnel_creation():
         "station_id": "station-001"
     }
     
-    response = requests.post(f"{BASE_URL}/api/personnel", json=personnel_data)
+    response = session.post(f"{BASE_URL}/api/personnel", json=personnel_data)
     assert response.status_code == 200, f"Failed to create personnel: {response.text}"
     
     personnel = response.json()
@@ -78,7 +80,7 @@ def test_unit_creation():
     
     unit_ids = []
     for unit_data in units_data:
-        response = requests.post(f"{BASE_URL}/api/units", json=unit_data)
+        response = session.post(f"{BASE_URL}/api/units", json=unit_data)
         assert response.status_code == 200, f"Failed to create unit: {response.text}"
         
         unit = response.json()
@@ -95,11 +97,11 @@ def test_unit_assignments():
     print_section("Test 3: Create Unit Assignments (Snowflake Integration)")
     
     # First, get existing personnel and units
-    personnel_resp = requests.get(f"{BASE_URL}/api/personnel")
+    personnel_resp = session.get(f"{BASE_URL}/api/personnel")
     assert personnel_resp.status_code == 200
     personnel_list = personnel_resp.json()
     
-    units_resp = requests.get(f"{BASE_URL}/api/units")
+    units_resp = session.get(f"{BASE_URL}/api/units")
     assert units_resp.status_code == 200
     units_list = units_resp.json()
     
@@ -126,7 +128,7 @@ def test_unit_assignments():
                 "assignment_status": "ON_SHIFT"
             }
             
-            response = requests.post(f"{BASE_URL}/api/unit-assignments", json=assignment_data)
+            response = session.post(f"{BASE_URL}/api/unit-assignments", json=assignment_data)
             if response.status_code == 200:
                 assignment = response.json()
                 assignments.append(assignment)
@@ -145,7 +147,7 @@ def test_readiness_endpoints():
     print_section("Test 4: Readiness Calculation Endpoints")
     
     # Get all units readiness
-    response = requests.get(f"{BASE_URL}/api/readiness/units")
+    response = session.get(f"{BASE_URL}/api/readiness/units")
     assert response.status_code == 200, f"Failed to get readiness: {response.text}"
     
     readiness_list = response.json()
@@ -169,7 +171,7 @@ def test_readiness_history(unit_id):
         print("⚠️  No unit ID available, skipping history test")
         return
     
-    response = requests.get(f"{BASE_URL}/api/readiness/units/{unit_id}/history?days=7")
+    response = session.get(f"{BASE_URL}/api/readiness/units/{unit_id}/history?days=7")
     
     if response.status_code == 200:
         history_data = response.json()
@@ -195,19 +197,19 @@ def test_certification_endpoints():
     print_section("Test 6: Certification Management Endpoints")
     
     # Test expiring certifications
-    response = requests.get(f"{BASE_URL}/api/certifications/expiring?days_ahead=30")
+    response = session.get(f"{BASE_URL}/api/certifications/expiring?days_ahead=30")
     assert response.status_code == 200
     expiring = response.json()
     print(f"✅ Expiring certifications (30 days): {len(expiring)}")
     
     # Test expired certifications
-    response = requests.get(f"{BASE_URL}/api/certifications/expired")
+    response = session.get(f"{BASE_URL}/api/certifications/expired")
     assert response.status_code == 200
     expired = response.json()
     print(f"✅ Expired certifications: {len(expired)}")
     
     # Test expiration check endpoint
-    response = requests.post(f"{BASE_URL}/api/certifications/check-expirations")
+    response = session.post(f"{BASE_URL}/api/certifications/check-expirations")
     assert response.status_code == 200
     result = response.json()
     print(f"✅ Expiration check completed")
@@ -236,7 +238,7 @@ def main():
     
     try:
         # Check if backend is running
-        response = requests.get(f"{BASE_URL}/health")
+        response = session.get(f"{BASE_URL}/health")
         if response.status_code != 200:
             print(f"\n❌ Backend not responding at {BASE_URL}")
             print("   Please start the backend: cd backend && uvicorn app.main:app --reload")
@@ -121,3 +121,16 @@ COMMENT ON TABLE PERSONNEL IS 'Emergency services personnel profiles with certif
 COMMENT ON TABLE UNITS IS 'Emergency response units with staffing requirements';
 COMMENT ON TABLE UNIT_ASSIGNMENTS IS 'Assignments of personnel to units for specified shift windows';
 
+-- Batched ingestion objects used by the FastAPI Snowflake writer
+-- (backend/app/services/snowflake_writer.py). The API PUTs newline-delimited
+-- JSON batches to INGEST_STAGE and loads them with COPY INTO (SHIFT_EVENTS) or
+-- MERGE (PERSONNEL, UNITS, UNIT_ASSIGNMENTS) instead of one INSERT per row.
+-- The backend also issues these IF NOT EXISTS statements on connect.
+CREATE FILE FORMAT IF NOT EXISTS INGEST_JSON_FORMAT
+    TYPE = 'JSON'
+    STRIP_OUTER_ARRAY = FALSE;
+
+CREATE STAGE IF NOT EXISTS INGEST_STAGE
+    FILE_FORMAT = INGEST_JSON_FORMAT;
+
+COMMENT ON STAGE INGEST_STAGE IS 'Internal stage for batched API ingestion (PUT + COPY INTO / MERGE)';
@@ -1,22 +1,23 @@
 -- Workforce & Shift Management Dashboard
 -- Snowflake Stage and Snowpipe Configuration
--- Optional: Use this if you want to ingest data from Kafka via Snowpipe
--- Alternative: Direct inserts from FastAPI (simpler for MVP)
+-- Optional: Use this if you want to ingest data from Kafka via Snowpipe.
+-- The FastAPI backend does not need this script: its batch-ingest stage and
+-- file format (INGEST_STAGE, INGEST_JSON_FORMAT) are created in 01_schema.sql.
 
 USE DATABASE WORKFORCE_DB;
 USE SCHEMA RAW;
 
 -- Create an external stage for Kafka (if using Snowpipe with Kafka connector)
 -- Note: This requires Snowpipe with Kafka connector setup in Snowflake
--- For MVP, you can skip this and use direct inserts from FastAPI
+-- Skip this if the FastAPI batch writer is your only ingestion path
 
 -- Example: Internal stage for file-based ingestion (alternative approach)
-CREATE OR REPLACE STAGE IF NOT EXISTS shift_events_stage
+CREATE STAGE IF NOT EXISTS shift_events_stage
     FILE_FORMAT = (TYPE = 'JSON');
 
 -- Create Snowpipe (if using file-based ingestion from Kafka)
 -- This would be configured to automatically load files from the stage
--- For now, we'll use direct inserts, so this is optional
+-- Only needed for Kafka/file-based ingestion; the API loads INGEST_STAGE itself
 
 -- Example Snowpipe definition (commented out - configure based on your setup):
 /*
@@ -29,8 +30,5 @@ FILE_FORMAT = (TYPE = 'JSON')
 MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE;
 */
 
--- For MVP: We'll use direct INSERT statements from FastAPI
--- This file serves as documentation for future Snowpipe setup
-
-COMMENT ON STAGE shift_events_stage IS 'Stage for shift events data ingestion (optional - using direct inserts for MVP)';
+COMMENT ON STAGE shift_events_stage IS 'Stage for Kafka/Snowpipe shift events ingestion (optional - the API uses INGEST_STAGE)';
 